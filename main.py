@@ -1,15 +1,112 @@
 import argparse
+import io
+import mmap
+import os
+import stat
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stderr, redirect_stdout
+from itertools import chain, islice, repeat
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from src.parser import to_postfix, RegexValidationError
 from src.thompson import postfix_to_nfa
 from src.hopcroft import minimize_hopcroft
 from src.exporter import (
-    export_json, export_dot, export_image, 
-    export_interactive_html, export_step_by_step_simulation
+    export_all, export_interactive_html, export_step_by_step_simulation
 )
 from src.automaton import EPSILON
+from src.codegen import codegen_simulator
+
+#cache de compilación por proceso: (regex, no_minimization) -> autómatas generados
+_COMPILE_CACHE: Dict[Tuple[str, bool], dict] = {}
+
+
+class _SafeNameTable(dict):
+    """Tabla para str.translate: alfanuméricos, '-' y '_' se conservan, el resto pasa a '_'.
+    
+    Los códigos fuera de ASCII se resuelven la primera vez que aparecen y quedan en la tabla.
+    """
+    def __missing__(self, code: int) -> str:
+        ch = chr(code)
+        value = ch if ch.isalnum() or ch in '-_' else '_'
+        self[code] = value
+        return value
+
+
+_SAFE_TABLE = _SafeNameTable()
+#precargar ascii al importar el módulo
+for _code in range(128):
+    _SAFE_TABLE.__missing__(_code)
+
+EXPORT_FORMATS = ("json", "dot", "png", "html")
+
+
+class _FolderNameTable(dict):
+    """Tabla para str.translate de nombres de carpeta: los operadores de regex se
+    reemplazan por su nombre y cualquier otro carácter no permitido pasa a '_'.
+    """
+    def __missing__(self, code: int) -> str:
+        self[code] = '_'
+        return '_'
+
+
+_FOLDER_TABLE = _FolderNameTable(str.maketrans({
+    '*': '_STAR_',
+    '+': '_PLUS_',
+    '?': '_Q_',
+    '|': '_OR_',
+    '.': '_DOT_',
+    '[': '_LB_',
+    ']': '_RB_',
+    '{': '_LCB_',
+    '}': '_RCB_',
+    '^': '_CARET_',
+    '$': '_DOLLAR_',
+    '\\': '_BSLASH_',
+    '/': '_SLASH_',
+    ' ': '_',
+}))
+#letras y dígitos ascii, '-', '_' y paréntesis se conservan tal cual
+for _ch in "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_()":
+    _FOLDER_TABLE[ord(_ch)] = _ch
+
+
+def sanitize_folder_name(s: str, maxlen: int = 40) -> str:
+    """Nombre de carpeta para una regex: mantener paréntesis, reemplazar operadores y otros caracteres problemáticos"""
+    return s.translate(_FOLDER_TABLE)[:maxlen]
+
+
+def parse_formats(value: str) -> frozenset:
+    """Convierte 'json,dot,...' en el conjunto de formatos de exportación"""
+    formats = frozenset(f.strip().lower() for f in value.split(',') if f.strip())
+    unknown = formats - set(EXPORT_FORMATS)
+    if unknown:
+        raise argparse.ArgumentTypeError(
+            f"formato no soportado: {', '.join(sorted(unknown))} (opciones: {', '.join(EXPORT_FORMATS)})"
+        )
+    return formats
+
+
+def resolve_formats(args) -> frozenset:
+    """
+    Formatos a exportar según los argumentos.
+    
+    --formats manda; sin él se exporta json, dot y png (salvo --no-images),
+    o solo json con --quiet. --html siempre agrega html.
+    """
+    formats = getattr(args, 'formats', None)
+    if formats is None:
+        if args.quiet:
+            formats = frozenset({"json"})
+        else:
+            formats = frozenset({"json", "dot", "png"})
+    if args.no_images:
+        formats = formats - {"png"}
+    if args.html:
+        formats = formats | {"html"}
+    return formats
+
 
 def create_parser() -> argparse.ArgumentParser:
     """Crear parser de argumentos de línea de comandos"""
@@ -21,10 +118,12 @@ Ejemplos de uso:
   python main.py                          # Modo interactivo
   python main.py -r "a*b+"               # Procesar regex específica
   python main.py -r "a|b" --no-images    # Sin generar imágenes
+  python main.py -f regexes.txt -q --formats json,dot  # Elegir formatos a exportar
   python main.py -r "a*" -o custom_dir   # Directorio de salida personalizado
   python main.py -f regexes.txt          # Procesar archivo con múltiples regex
   python main.py -r "a*b" --html         # Generar visualización HTML
   python main.py -r "a*b" -s "ab,aab"    # Simular cadenas específicas
+  python main.py -r "a*b" -s @cadenas.txt  # Simular cadenas desde archivo
   
 Operadores soportados:
   |    - Alternancia (or)
@@ -69,6 +168,13 @@ Operadores soportados:
         action="store_true",
         help="Generar visualización HTML interactiva"
     )
+    parser.add_argument(
+        "--formats",
+        type=parse_formats,
+        default=None,
+        help="Formatos a exportar separados por comas: json,dot,png,html "
+             "(default: json,dot,png; solo json con --quiet)"
+    )
     parser.add_argument(
         "--enhanced-dot",
         action="store_true",
@@ -79,7 +185,7 @@ Operadores soportados:
     parser.add_argument(
         "-s", "--simulate",
         type=str,
-        help="Cadenas a simular separadas por comas (ej: 'ab,aab,b')"
+        help="Cadenas a simular separadas por comas (ej: 'ab,aab,b') o @archivo con una cadena por línea"
     )
     parser.add_argument(
         "--step-by-step",
@@ -103,6 +209,12 @@ Operadores soportados:
         action="store_true",
         help="No minimizar el AFD"
     )
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=1,
+        help="Procesos para procesar varias regex en paralelo (default: 1; 0 = núcleos disponibles)"
+    )
     
     return parser
 
@@ -118,6 +230,14 @@ def process_regex(regex: str, args) -> Optional[dict]:
         if not args.quiet:
             print(f"Procesando regex: {regex}")
         
+        #solo los flags que afectan la construcción forman parte de la clave
+        cache_key = (regex, bool(args.no_minimization))
+        cached = _COMPILE_CACHE.get(cache_key)
+        if cached is not None:
+            if args.verbose:
+                print("  Autómatas reutilizados desde cache")
+            return cached
+        
         #paso 1: convertir a postfix
         postfix = to_postfix(regex)
         if args.verbose:
@@ -129,13 +249,15 @@ def process_regex(regex: str, args) -> Optional[dict]:
             print(f"  AFN: {len(nfa.states)} estados, {len(nfa.accepts)} aceptación")
         
         #paso 3: determinizar
+        already_dfa = nfa.is_deterministic()
         dfa = nfa.determinize()
         if args.verbose:
             print(f"  AFD: {len(dfa.states)} estados, {len(dfa.accepts)} aceptación")
         
         #paso 4: minimizar
         if not args.no_minimization:
-            dfa_min = minimize_hopcroft(dfa)
+            #la construcción de subconjuntos solo genera estados alcanzables
+            dfa_min = minimize_hopcroft(dfa, assume_reachable=not already_dfa)
             if args.verbose:
                 print(f"  AFD mínimo: {len(dfa_min.states)} estados, {len(dfa_min.accepts)} aceptación")
         else:
@@ -143,13 +265,15 @@ def process_regex(regex: str, args) -> Optional[dict]:
             if args.verbose:
                 print("  Minimización omitida")
         
-        return {
+        result = {
             'regex': regex,
             'postfix': postfix,
             'nfa': nfa,
             'dfa': dfa,
             'dfa_min': dfa_min
         }
+        _COMPILE_CACHE[cache_key] = result
+        return result
         
     except (RegexValidationError, ValueError) as e:
         print(f"Error procesando '{regex}': {e}", file=sys.stderr)
@@ -166,89 +290,49 @@ def export_automata(result: dict, args, output_dir: Path) -> None:
     dfa = result['dfa']
     dfa_min = result['dfa_min']
     
-    # Sanitizar nombre para carpeta: mantener paréntesis, eliminar puntos y otros caracteres problemáticos
-    def sanitize_folder_name(s: str, maxlen: int = 40) -> str:
-        replacements = {
-            '*': '_STAR_',
-            '+': '_PLUS_',
-            '?': '_Q_',
-            '|': '_OR_',
-            '.': '_DOT_',
-            '[': '_LB_',
-            ']': '_RB_',
-            '{': '_LCB_',
-            '}': '_RCB_',
-            '^': '_CARET_',
-            '$': '_DOLLAR_',
-            '\\': '_BSLASH_',
-            '/': '_SLASH_',
-            ' ': '_',
-        }
-        allowed = set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_()")
-        result = []
-        for c in s:
-            if c in allowed:
-                result.append(c)
-            elif c in replacements:
-                result.append(replacements[c])
-            else:
-                result.append('_')
-        return ''.join(result)[:maxlen]
-
     safe_name = sanitize_folder_name(regex)
     regex_dir = output_dir / safe_name
     regex_dir.mkdir(exist_ok=True)
     
     try:
-        # Exportar JSON
-        export_json(nfa, str(regex_dir / "afn.json"))
-        export_json(dfa, str(regex_dir / "afd.json"))
-        export_json(dfa_min, str(regex_dir / "afd_min.json"))
-
-        # Exportar DOT
+        # Exportar JSON, DOT e imágenes PNG serializando cada autómata una sola vez
         enhanced = args.enhanced_dot
-        export_dot(nfa, str(regex_dir / "afn.dot"), enhanced=enhanced)
-        export_dot(dfa, str(regex_dir / "afd.dot"), enhanced=enhanced)
-        export_dot(dfa_min, str(regex_dir / "afd_min.dot"), enhanced=enhanced)
+        selected = resolve_formats(args)
+        formats = tuple(f for f in ("json", "dot", "png") if f in selected)
+        images = [
+            ("afn", nfa, "afn"),
+            ("afd", dfa, "afd"),
+            ("afd mínimo", dfa_min, "afd_min"),
+        ]
+        rendered = export_all(
+            [(a, str(regex_dir / basename)) for _, a, basename in images],
+            enhanced=enhanced,
+            formats=formats
+        )
 
-        if not args.quiet:
-            print(f"  Archivos JSON y DOT exportados para '{regex}' en '{regex_dir}'")
+        exported = " y ".join(f.upper() for f in ("json", "dot") if f in selected)
+        if exported and not args.quiet:
+            print(f"  Archivos {exported} exportados para '{regex}' en '{regex_dir}'")
 
-        # Exportar imágenes PNG
         images_generated = 0
-        if not args.no_images:
-            if export_image(nfa, str(regex_dir / "afn.png"), enhanced=enhanced):
-                if args.verbose:
-                    print(f"  imagen afn generada: {safe_name}/afn.png")
-                images_generated += 1
-            else:
-                if args.verbose:
-                    print(f"  no se pudo generar imagen afn")
-
-            if export_image(dfa, str(regex_dir / "afd.png"), enhanced=enhanced):
-                if args.verbose:
-                    print(f"  imagen afd generada: {safe_name}/afd.png")
-                images_generated += 1
-            else:
-                if args.verbose:
-                    print(f"  no se pudo generar imagen afd")
-
-            if export_image(dfa_min, str(regex_dir / "afd_min.png"), enhanced=enhanced):
-                if args.verbose:
-                    print(f"  imagen afd mínimo generada: {safe_name}/afd_min.png")
-                images_generated += 1
-            else:
-                if args.verbose:
-                    print(f"  no se pudo generar imagen afd mínimo")
+        if "png" in selected:
+            for (label, _, basename), ok in zip(images, rendered):
+                if ok:
+                    if args.verbose:
+                        print(f"  imagen {label} generada: {safe_name}/{basename}.png")
+                    images_generated += 1
+                else:
+                    if args.verbose:
+                        print(f"  no se pudo generar imagen {label}")
 
-        if images_generated == 0 and not args.quiet:
+        if "png" in selected and images_generated == 0 and not args.quiet:
             print("  Nota: Para generar imágenes, instala Graphviz:")
             print("    Ubuntu/Debian: sudo apt-get install graphviz")
             print("    macOS: brew install graphviz")
             print("    Windows: https://graphviz.org/download/")
 
         # Exportar HTML interactivo
-        if args.html:
+        if "html" in selected:
             html_path = regex_dir / "interactive.html"
             if export_interactive_html(dfa_min, str(html_path)):
                 if not args.quiet:
@@ -261,8 +345,88 @@ def export_automata(result: dict, args, output_dir: Path) -> None:
         print(f"Error exportando '{regex}': {e}", file=sys.stderr)
 
 
-def simulate_strings(result: dict, strings: List[str], args, output_dir: Path) -> None:
-    """Simular cadenas en el afd mínimo"""
+def _iter_file_lines(path: str) -> Iterator[str]:
+    """
+    Recorre las líneas de un archivo mapeado en memoria, sin el salto de línea.
+    
+    Las líneas se decodifican a medida que se piden, así que no se carga el
+    archivo completo antes de empezar a procesarlo. Pipes, FIFOs y archivos
+    vacíos no se pueden mapear y se leen línea por línea.
+    """
+    with open(path, 'rb') as f:
+        info = os.fstat(f.fileno())
+        if not stat.S_ISREG(info.st_mode) or info.st_size == 0:
+            for raw in f:
+                yield raw.decode('utf-8').rstrip('\r\n')
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for raw in iter(mm.readline, b''):
+                yield raw.decode('utf-8').rstrip('\r\n')
+
+
+def read_regex_file(path: str) -> Iterator[str]:
+    """
+    Lee las regex de un archivo bajo demanda (una por línea).
+    
+    Se ignoran las líneas vacías y los comentarios que inician con '#'.
+    """
+    for line in _iter_file_lines(path):
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield line
+
+
+def read_strings_file(path: str) -> Iterator[str]:
+    """Lee las cadenas a simular de un archivo (una por línea, se omiten las vacías)"""
+    return (line for line in _iter_file_lines(path) if line)
+
+
+def _unique_folders(regexes: Iterable[str], positions: List[int],
+                    deferred: List[Tuple[int, str]]) -> Iterator[str]:
+    """
+    Deja pasar solo la primera regex de cada carpeta de salida.
+    
+    Las que comparten carpeta con una anterior se guardan en deferred, junto con
+    su posición en la entrada, para procesarlas después; así dos procesos nunca
+    escriben la misma carpeta. La posición de cada regex emitida va a positions.
+    """
+    seen = set()
+    for index, regex in enumerate(regexes):
+        name = sanitize_folder_name(regex)
+        if name in seen:
+            deferred.append((index, regex))
+        else:
+            seen.add(name)
+            positions.append(index)
+            yield regex
+
+
+def _process_and_export(regex: str, options: dict, output_dir: str) -> Tuple[Optional[dict], str, str]:
+    """
+    Procesar y exportar una regex en un proceso trabajador.
+    
+    Recibe los argumentos como dict (picklable) y captura la salida para que
+    el proceso principal la imprima en orden.
+    
+    Returns:
+        (resultado o None, salida estándar, salida de error)
+    """
+    args = argparse.Namespace(**options)
+    out, err = io.StringIO(), io.StringIO()
+    with redirect_stdout(out), redirect_stderr(err):
+        result = process_regex(regex, args)
+        if result:
+            export_automata(result, args, Path(output_dir))
+    return result, out.getvalue(), err.getvalue()
+
+
+def simulate_strings(result: dict, strings: Iterable[str], args, output_dir: Path, summary: bool = False) -> None:
+    """
+    Simular cadenas en el afd mínimo.
+    
+    Con summary=True (cadenas leídas de archivo) cada cadena solo se muestra
+    con --verbose y al final se imprime el conteo de aceptadas y rechazadas.
+    """
     dfa_min = result['dfa_min']
     regex = result['regex']
     
@@ -273,20 +437,39 @@ def simulate_strings(result: dict, strings: List[str], args, output_dir: Path) -
     if not args.quiet:
         print(f"\nSimulación en AFD mínimo para '{regex}':")
     
+    #con muchas cadenas (o un archivo) se amortiza generar un simulador especializado para el afd
+    simulate = codegen_simulator(dfa_min, len(strings) if isinstance(strings, list) else None)
+    
+    #símbolos válidos una sola vez por autómata; el texto del error solo si se necesita
+    valid_symbols = frozenset(dfa_min.alphabet | {EPSILON})
+    valid_symbols_msg = None
+    
+    accepted_count = rejected_count = error_count = 0
     for string in strings:
         try:
-            #verificar símbolos válidos
-            valid_symbols = dfa_min.alphabet | {EPSILON}
-            for char in string:
-                if char not in valid_symbols:
-                    print(f"  '{string}': Error - símbolo '{char}' no válido")
-                    print(f"    Símbolos válidos: {sorted(valid_symbols - {EPSILON})}")
-                    continue
+            #verificar símbolos válidos (una cadena con símbolos inválidos no se simula)
+            if not valid_symbols.issuperset(string):
+                char = next(c for c in string if c not in valid_symbols)
+                if valid_symbols_msg is None:
+                    valid_symbols_msg = f"    Símbolos válidos: {sorted(valid_symbols - {EPSILON})}"
+                print(f"  '{string}': Error - símbolo '{char}' no válido")
+                print(valid_symbols_msg)
+                error_count += 1
+                continue
             
-            path, accepted = dfa_min.simulate_dfa_path(string)
+            path, accepted = simulate(string)
             status = "ACEPTADA" if accepted else "RECHAZADA"
+            if accepted:
+                accepted_count += 1
+            else:
+                rejected_count += 1
             
-            if args.verbose:
+            #la trayectoria solo se formatea cuando se va a mostrar
+            if summary and not args.verbose:
+                pass
+            elif args.quiet:
+                print(f"  '{string}': {status}")
+            elif args.verbose:
                 print(f"  '{string}': {status}")
                 print(f"    Trayectoria: {' → '.join(path)}")
             else:
@@ -294,8 +477,8 @@ def simulate_strings(result: dict, strings: List[str], args, output_dir: Path) -
             
             #generar simulación paso a paso en HTML si se solicita
             if args.step_by_step:
-                safe_name = "".join(c if c.isalnum() or c in '-_' else '_' for c in regex[:20])
-                safe_string = "".join(c if c.isalnum() or c in '-_' else '_' for c in string)
+                safe_name = regex[:20].translate(_SAFE_TABLE)
+                safe_string = string.translate(_SAFE_TABLE)
                 html_path = output_dir / f"{safe_name}_sim_{safe_string}.html"
                 
                 if export_step_by_step_simulation(dfa_min, string, str(html_path)):
@@ -303,7 +486,11 @@ def simulate_strings(result: dict, strings: List[str], args, output_dir: Path) -
                         print(f"    simulación paso a paso: {html_path.name}")
                 
         except Exception as e:
+            error_count += 1
             print(f"  '{string}': Error - {e}")
+    
+    if summary:
+        print(f"  Aceptadas: {accepted_count}, Rechazadas: {rejected_count}, Errores: {error_count}")
 
 
 def interactive_mode():
@@ -330,6 +517,7 @@ def interactive_mode():
             no_minimization = False
             no_images = False
             html = False
+            formats = None
             enhanced_dot = True
             step_by_step = False
         
@@ -368,6 +556,12 @@ def main():
         print("Error: --quiet y --verbose son mutuamente excluyentes", file=sys.stderr)
         return 1
     
+    #-s @archivo: una cadena por línea, leída de nuevo para cada autómata
+    strings_file = args.simulate[1:] if args.simulate and args.simulate.startswith('@') else None
+    if strings_file is not None and not os.path.exists(strings_file):
+        print(f"Error: Archivo '{strings_file}' no encontrado", file=sys.stderr)
+        return 1
+    
     #crear directorio de salida
     output_dir = Path(args.output)
     output_dir.mkdir(exist_ok=True)
@@ -381,54 +575,105 @@ def main():
             print("\nPrograma interrumpido por el usuario")
             return 0
     
-    #recopilar regex
-    regexes = []
-    
-    if args.regex:
-        regexes.append(args.regex)
+    #recopilar regex (las del archivo se leen a medida que se procesan)
+    regexes: Iterator[str] = iter([args.regex] if args.regex else [])
     
     if args.file:
-        try:
-            with open(args.file, 'r', encoding='utf-8') as f:
-                file_regexes = [line.strip() for line in f if line.strip() and not line.strip().startswith('#')]
-                regexes.extend(file_regexes)
-        except FileNotFoundError:
-            print(f"Error: Archivo '{args.file}' no encontrado", file=sys.stderr)
-            return 1
-        except Exception as e:
-            print(f"Error leyendo archivo '{args.file}': {e}", file=sys.stderr)
-            return 1
+        regexes = chain(regexes, read_regex_file(args.file))
     
-    if not regexes:
+    try:
+        #se miran las dos primeras para decidir si vale la pena repartir en procesos
+        head = list(islice(regexes, 2))
+    except FileNotFoundError:
+        print(f"Error: Archivo '{args.file}' no encontrado", file=sys.stderr)
+        return 1
+    except Exception as e:
+        print(f"Error leyendo archivo '{args.file}': {e}", file=sys.stderr)
+        return 1
+    
+    if not head:
         print("Error: No hay regex para procesar", file=sys.stderr)
         return 1
+    regexes = chain(head, regexes)
     
     #procesar cada regex
     successful_results = []
     errors = 0
     
-    for regex in regexes:
+    def process_here(regex: str) -> Optional[dict]:
         result = process_regex(regex, args)
         if result:
-            successful_results.append(result)
             export_automata(result, args, output_dir)
+        return result
+    
+    jobs = args.jobs or os.cpu_count() or 1
+    try:
+        if len(head) > 1 and jobs > 1:
+            #regex independientes: repartir entre procesos; las que repiten carpeta se
+            #procesan en este proceso cuando ya terminó la anterior de su carpeta, y todo
+            #se muestra y se guarda en el orden de la entrada
+            positions: List[int] = []
+            deferred: List[Tuple[int, str]] = []
+            pending = 0
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                outcomes = executor.map(
+                    _process_and_export, _unique_folders(regexes, positions, deferred),
+                    repeat(vars(args)), repeat(str(output_dir))
+                )
+                for (result, out, err), position in zip(outcomes, positions):
+                    while pending < len(deferred) and deferred[pending][0] < position:
+                        outcome = process_here(deferred[pending][1])
+                        pending += 1
+                        if outcome:
+                            successful_results.append(outcome)
+                        else:
+                            errors += 1
+                    sys.stdout.write(out)
+                    sys.stderr.write(err)
+                    if result:
+                        successful_results.append(result)
+                    else:
+                        errors += 1
+            regexes = (regex for _, regex in deferred[pending:])
+        for regex in regexes:
+            result = process_here(regex)
+            if result:
+                successful_results.append(result)
+            else:
+                errors += 1
+    except (OSError, UnicodeDecodeError) as e:
+        #el archivo se lee a medida que se procesa: un error a mitad también es de lectura
+        if args.file:
+            print(f"Error leyendo archivo '{args.file}': {e}", file=sys.stderr)
         else:
-            errors += 1
+            print(f"Error: {e}", file=sys.stderr)
+        return 1
     
     #sim de cadenas
     if args.simulate and successful_results:
-        strings = [s.strip() for s in args.simulate.split(',') if s.strip()]
+        strings = [s.strip() for s in args.simulate.split(',') if s.strip()] if strings_file is None else []
         
         if not args.quiet:
             print(f"\n=== Simulación de cadenas ===")
         
-        for result in successful_results:
-            simulate_strings(result, strings, args, output_dir)
+        try:
+            #un pipe solo se puede leer una vez: sus cadenas se guardan para todos los autómatas
+            if strings_file is not None and not os.path.isfile(strings_file):
+                strings = list(read_strings_file(strings_file))
+                strings_file = None
+            for result in successful_results:
+                if strings_file is not None:
+                    simulate_strings(result, read_strings_file(strings_file), args, output_dir, summary=True)
+                else:
+                    simulate_strings(result, strings, args, output_dir, summary=args.simulate.startswith('@'))
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"Error leyendo archivo '{args.simulate[1:]}': {e}", file=sys.stderr)
+            return 1
     
     #resumen final
     if not args.quiet:
         print(f"\n=== Resumen ===")
-        print(f"Regex procesadas: {len(regexes)}")
+        print(f"Regex procesadas: {len(successful_results) + errors}")
         print(f"Exitosas: {len(successful_results)}")
         print(f"Errores: {errors}")
         print(f"Archivos generados en: {output_dir}")
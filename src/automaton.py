@@ -1,17 +1,89 @@
 from __future__ import annotations
+import sys
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Set, Dict, Optional, Iterable, FrozenSet, List, Tuple
-from functools import lru_cache
+from typing import Callable, Deque, Set, Dict, FrozenSet, Optional, Iterable, List, Sequence, Tuple
+from array import array
 
 EPSILON = "ε"
 
-@dataclass
+#resultados vacíos compartidos para consultas de solo lectura
+_EMPTY_SET: FrozenSet[str] = frozenset()
+_EMPTY_MAP: Dict[str, FrozenSet[str]] = {}
+
+
+def _epsilon_closure_bits(eps_succ: List[Sequence[int]]) -> List[int]:
+    """
+    ε-clausuras de todos los estados como bitsets, en una pasada O(V+E).
+
+    Tarjan iterativo sobre el subgrafo ε (eps_succ[i] son los ε-sucesores de i):
+    las componentes fuertemente conexas salen en orden topológico inverso, así
+    que al cerrar una componente las clausuras de sus sucesores ya existen.
+    Todos los estados de una componente comparten la misma clausura.
+    """
+    n = len(eps_succ)
+    eclose = [1 << i for i in range(n)]
+    order = [-1] * n  #orden de descubrimiento
+    low = [0] * n
+    comp = [-1] * n  #componente de cada estado ya cerrado
+    scc_stack: List[int] = []
+    counter = 0
+    components = 0
+    for root in range(n):
+        #sin ε-sucesores la clausura es el propio estado
+        if order[root] >= 0 or not eps_succ[root]:
+            continue
+        work = [(root, 0)]
+        order[root] = low[root] = counter
+        counter += 1
+        scc_stack.append(root)
+        while work:
+            v, k = work[-1]
+            if k < len(eps_succ[v]):
+                work[-1] = (v, k + 1)
+                w = eps_succ[v][k]
+                if order[w] < 0:
+                    order[w] = low[w] = counter
+                    counter += 1
+                    scc_stack.append(w)
+                    work.append((w, 0))
+                elif comp[w] < 0 and order[w] < low[v]:
+                    low[v] = order[w]
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                if low[v] < low[parent]:
+                    low[parent] = low[v]
+            if low[v] != order[v]:
+                continue
+            #v es raíz de su componente: sacar sus miembros y cerrarla
+            members = []
+            while True:
+                w = scc_stack.pop()
+                comp[w] = components
+                members.append(w)
+                if w == v:
+                    break
+            bits = 0
+            for w in members:
+                bits |= 1 << w
+            for w in members:
+                for x in eps_succ[w]:
+                    if comp[x] != components:
+                        bits |= eclose[x]
+            for w in members:
+                eclose[w] = bits
+            components += 1
+    return eclose
+
+@dataclass(slots=True)
 class Automaton:
     """Representa un autómata finito (posiblemente no determinista con transiciones ε).
 
     Este diseño es deliberadamente simple para fines educativos.
     - Los estados se representan como strings (o enteros casteados a string).
-    - transiciones: dict estado -> dict simbolo -> conjunto de estados destino.
+    - transiciones: dict estado -> dict simbolo -> frozenset de estados destino.
     - initial: estado inicial.
     - accepts: conjunto de estados de aceptación.
     - alphabet: símbolos distintos de EPSILON.
@@ -20,14 +92,37 @@ class Automaton:
     - Cache para clausura epsilon
     - Sets para operaciones eficientes
     - Validaciones mínimas en operaciones críticas
+    - __slots__ (dataclass slots=True): sin __dict__ por instancia; las caches
+      también son campos declarados
     """
 
     states: Set[str] = field(default_factory=set)
     alphabet: Set[str] = field(default_factory=set)
-    transitions: Dict[str, Dict[str, Set[str]]] = field(default_factory=dict)
+    transitions: Dict[str, Dict[str, FrozenSet[str]]] = field(default_factory=dict)
     initial: Optional[str] = None
     accepts: Set[str] = field(default_factory=set)
-    _epsilon_cache: Dict[str, Set[str]] = field(default_factory=dict, init=False, repr=False)
+    _epsilon_cache: Dict[str, FrozenSet[str]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _dense_cache: Optional[Tuple[List[str], Dict[str, int], int, array, bytes, int, Optional[bytes]]] = field(default=None, init=False, repr=False, compare=False)
+    _simulator_cache: Optional[Callable[[str], Tuple[List[str], bool]]] = field(default=None, init=False, repr=False, compare=False)
+    _det_cache: Optional[bool] = field(default=None, init=False, repr=False, compare=False)
+    _has_eps_cache: Optional[bool] = field(default=None, init=False, repr=False, compare=False)
+    _compact_cache: Optional[Tuple[List[str], Dict[str, int], List[str], List[List[Sequence[int]]], List[int]]] = field(default=None, init=False, repr=False, compare=False)
+    _normalized_cache: Optional["Automaton"] = field(default=None, init=False, repr=False, compare=False)
+
+    #las caches son derivadas (y el simulador generado no es serializable):
+    #al serializar solo viajan los campos públicos y las caches se reconstruyen
+    def __getstate__(self) -> Tuple[Set[str], Set[str], Dict[str, Dict[str, FrozenSet[str]]], Optional[str], Set[str]]:
+        return self.states, self.alphabet, self.transitions, self.initial, self.accepts
+
+    def __setstate__(self, state: Tuple[Set[str], Set[str], Dict[str, Dict[str, FrozenSet[str]]], Optional[str], Set[str]]) -> None:
+        self.states, self.alphabet, self.transitions, self.initial, self.accepts = state
+        self._epsilon_cache = {}
+        self._dense_cache = None
+        self._simulator_cache = None
+        self._det_cache = None
+        self._has_eps_cache = None
+        self._compact_cache = None
+        self._normalized_cache = None
 
     # ---------------- Construcción básica -----------------
     def add_state(self, name: str, *, accept: bool = False, initial: bool = False) -> None:
@@ -39,6 +134,8 @@ class Automaton:
             accept: Si es estado de aceptación
             initial: Si es estado inicial
         """
+        #nombres internados: las búsquedas en dicts comparan primero por identidad
+        name = sys.intern(name)
         if name in self.states:
             #permitir idempotencia
             if accept:
@@ -55,8 +152,12 @@ class Automaton:
         if initial:
             self.initial = name
         
-        #invalidar cache al añadir estado
+        #invalidar cache al añadir estado (un estado sin transiciones no cambia el determinismo)
         self._epsilon_cache.clear()
+        self._dense_cache = None
+        self._simulator_cache = None
+        self._compact_cache = None
+        self._normalized_cache = None
 
     def add_transition(self, src: str, symbol: str, dest: str) -> None:
         """
@@ -75,148 +176,277 @@ class Automaton:
         if symbol != EPSILON:
             self.alphabet.add(symbol)
             
-        #usar setdefault es más eficiente que verificar existencia
-        bucket = self.transitions[src].setdefault(symbol, set())
-        bucket.add(dest)
+        #los destinos se guardan como frozenset y se reemplazan al crecer: el grado
+        #de salida es pequeño y así las consultas pueden devolverlos sin copiar
+        mp = self.transitions[src]
+        bucket = mp.get(symbol)
+        if bucket is None:
+            mp[symbol] = frozenset((dest,))
+        elif dest not in bucket:
+            mp[symbol] = bucket | {dest}
+        self._dense_cache = None
+        self._simulator_cache = None
+        self._compact_cache = None
+        self._normalized_cache = None
+        #solo una transición ε o un segundo destino rompen el determinismo
+        if self._det_cache and (symbol == EPSILON or len(mp[symbol]) > 1):
+            self._det_cache = False
         
         #invalidar cache si es transición epsilon
         if symbol == EPSILON:
             self._epsilon_cache.clear()
+            self._has_eps_cache = True
 
     # ---------------- Consultas optimizadas -----------------
-    def get_transitions(self, state: str, symbol: str) -> Set[str]:
-        """Obtiene transiciones de forma optimizada usando get()"""
-        return self.transitions.get(state, {}).get(symbol, set()).copy()
+    def get_transitions(self, state: str, symbol: str) -> FrozenSet[str]:
+        """Obtiene transiciones de forma optimizada usando get().
+
+        Devuelve el frozenset interno sin copiarlo.
+        """
+        return self.transitions.get(state, _EMPTY_MAP).get(symbol, _EMPTY_SET)
 
-    def epsilon_closure(self, states: Iterable[str]) -> Set[str]:
+    def epsilon_closure(self, states: Iterable[str]) -> FrozenSet[str]:
         """
         Devuelve la ε-clausura de un conjunto de estados de forma optimizada.
-        Usa cache para estados individuales.
+        Une las clausuras precalculadas de cada estado sin copiarlas.
         """
         if isinstance(states, str):
             #caso especial para un solo estado
             return self._epsilon_closure_single(states)
+        if not self._has_epsilon():
+            return frozenset(states)
         
-        #para múltiples estados, combinar resultados
-        result = set()
-        for state in states:
-            result.update(self._epsilon_closure_single(state))
-        return result
+        #para múltiples estados, unir las clausuras cacheadas
+        return frozenset().union(*(self._epsilon_closure_single(state) for state in states))
     
-    def _epsilon_closure_single(self, state: str) -> Set[str]:
-        """Clausura epsilon optimizada para un solo estado con cache"""
-        if state in self._epsilon_cache:
-            return self._epsilon_cache[state].copy()
-        
-        closure = {state}
-        stack = [state]
-        
-        while stack:
-            current = stack.pop()
-            epsilon_transitions = self.transitions.get(current, {}).get(EPSILON, set())
-            
-            for next_state in epsilon_transitions:
-                if next_state not in closure:
-                    closure.add(next_state)
-                    stack.append(next_state)
-        
-        #cache el resultado
-        self._epsilon_cache[state] = closure.copy()
-        return closure
-        return closure
+    def _has_epsilon(self) -> bool:
+        """Si el autómata tiene alguna transición ε (cacheado)"""
+        if self._has_eps_cache is None:
+            self._has_eps_cache = any(EPSILON in mp for mp in self.transitions.values())
+        return self._has_eps_cache
+
+    def _epsilon_closure_single(self, state: str) -> FrozenSet[str]:
+        """Clausura epsilon de un solo estado (a partir de los bitsets de _compact, frozenset compartido)"""
+        cached = self._epsilon_cache.get(state)
+        if cached is None:
+            names, index, _, _, eclose = self._compact()
+            i = index.get(state)
+            if i is None:
+                #estado desconocido: solo se alcanza a sí mismo
+                return frozenset((state,))
+            members = []
+            rest = eclose[i]
+            while rest:
+                low = rest & -rest
+                members.append(names[low.bit_length() - 1])
+                rest ^= low
+            cached = self._epsilon_cache[state] = frozenset(members)
+        return cached
 
     # ---------------- Simulación -----------------
     def simulate_nfa(self, input_str: str) -> bool:
         if self.initial is None:
             raise ValueError("Autómata sin estado inicial")
-        current = self.epsilon_closure({self.initial})
+        #conjuntos de estados como bitsets sobre la numeración de _compact
+        names, index, symbols, trans, eclose = self._compact()
+        start = index.get(self.initial)
+        if start is None:
+            return not input_str and self.initial in self.accepts
+        sym_index = {sym: j for j, sym in enumerate(symbols)}
+        current = eclose[start]
+        #cada (conjunto, símbolo) se calcula una vez por cadena (DFA perezoso)
+        seen: Dict[Tuple[int, str], int] = {}
         for ch in input_str:
-            next_states: Set[str] = set()
-            for s in current:
-                for dest in self.get_transitions(s, ch):
-                    next_states.update(self.epsilon_closure({dest}))
-            current = next_states
+            key = (current, ch)
+            nxt = seen.get(key)
+            if nxt is None:
+                nxt = 0
+                j = sym_index.get(ch)
+                if j is not None:
+                    rest = current
+                    while rest:
+                        low = rest & -rest
+                        for dest in trans[low.bit_length() - 1][j]:
+                            nxt |= eclose[dest]
+                        rest ^= low
+                seen[key] = nxt
+            current = nxt
             if not current:
-                break
-        return any(s in self.accepts for s in current)
+                return False
+        #aceptación: una sola intersección con la máscara de estados finales
+        accept_mask = 0
+        for s in self.accepts:
+            if s in index:
+                accept_mask |= 1 << index[s]
+        return bool(current & accept_mask)
 
     def is_deterministic(self) -> bool:
-        for s, trans in self.transitions.items():
-            if EPSILON in trans:
-                return False
-            for sym, dests in trans.items():
-                if len(dests) > 1:
-                    return False
-        return True
+        #resultado cacheado: la simulación lo consulta en cada cadena
+        if self._det_cache is None:
+            self._det_cache = not any(
+                EPSILON in trans or any(len(dests) > 1 for dests in trans.values())
+                for trans in self.transitions.values()
+            )
+        return self._det_cache
 
     def simulate_dfa(self, input_str: str) -> bool:
         if not self.is_deterministic():
             raise ValueError("simulate_dfa: el autómata no es determinista")
         if self.initial is None:
             raise ValueError("Autómata sin estado inicial")
-        state = self.initial
+        #misma tabla densa que simulate_dfa_path, sin construir el camino
+        _, sym_index, stride, table, accepting, dead, byte_lut = self._dense_table()
+        state = 0
+        if byte_lut is not None and input_str.isascii():
+            #camino ascii: índices de símbolo para toda la cadena en una pasada
+            encoded = input_str.encode("ascii").translate(byte_lut)
+            if 255 in encoded:
+                return False  #algún símbolo fuera del alfabeto
+            for sym in encoded:
+                state = table[state * stride + sym]
+                if state < 0 or state == dead:
+                    return False  #transición no definida o estado de absorción
+            return bool(accepting[state])
         for ch in input_str:
-            dests = self.get_transitions(state, ch)
-            if len(dests) != 1:
-                return False  #transición no definida o no determinista
-            (state,) = tuple(dests)
-        return state in self.accepts
+            sym = sym_index.get(ch)
+            if sym is None:
+                return False  #símbolo fuera del alfabeto
+            state = table[state * stride + sym]
+            if state < 0 or state == dead:
+                return False  #transición no definida o estado de absorción
+        return bool(accepting[state])
 
     # ---------------- Determinización (subset construction) -----------------
+    def _compact(self) -> Tuple[List[str], Dict[str, int], List[str], List[List[Sequence[int]]], List[int]]:
+        """
+        Representación entera del autómata para la construcción de subconjuntos.
+
+        Los estados se numeran por nombre ordenado (salvo que el constructor la
+        haya fijado con _seed_compact) y los símbolos por el alfabeto ordenado;
+        trans[estado][símbolo] es la lista de destinos y eclose[estado] la
+        ε-clausura como bitset (int). Se construye una vez y se invalida al
+        modificar el autómata.
+
+        Returns:
+            (nombres, índice de estados, símbolos, trans, eclose)
+        """
+        if self._compact_cache is None:
+            names = sorted(self.states)
+            index = {s: i for i, s in enumerate(names)}
+            symbols = sorted(self.alphabet)
+            trans: List[List[Sequence[int]]] = []
+            for s in names:
+                mp = self.transitions.get(s, {})
+                trans.append([[index[d] for d in mp.get(sym, ())] for sym in symbols])
+            if self._has_epsilon():
+                eps_succ = [[index[d] for d in self.transitions.get(s, {}).get(EPSILON, ())] for s in names]
+            else:
+                eps_succ = [[] for _ in names]
+            self._seed_compact(names, symbols, trans, eps_succ)
+        return self._compact_cache
+
+    def _seed_compact(self, names: List[str], symbols: List[str], trans: List[List[Sequence[int]]],
+                      eps_succ: List[Sequence[int]]) -> None:
+        """Fija la representación de _compact con la numeración names.
+
+        Los constructores que ya trabajan con estados enteros (Thompson) la dan
+        directamente y _compact no vuelve a traducir nombres a índices;
+        eps_succ[i] son los ε-sucesores de i. Las listas no se modifican después.
+        """
+        index = {s: i for i, s in enumerate(names)}
+        #ε-clausuras de todos los estados a la vez (componentes fuertes, O(V+E))
+        eclose = _epsilon_closure_bits(eps_succ)
+        self._compact_cache = (names, index, symbols, trans, eclose)
+
     def determinize(self) -> Automaton:
         if self.initial is None:
             raise ValueError("Autómata sin estado inicial")
 
         if self.is_deterministic():
-            return self  #ya es dfa
+            #ya es dfa: copia independiente para que el minimizador pueda modificarla
+            dfa = self.clone()
+            dfa._det_cache = True
+            return dfa
+
+        #estados nfa numerados densamente; los subconjuntos son bitsets en un int
+        names, index, symbols, trans, eclose = self._compact()
+        accept_bits = 0
+        for s in self.accepts:
+            if s in index:
+                accept_bits |= 1 << index[s]
+        #step[j][i]: clausura de los destinos de i con el símbolo j (movimiento + ε-clausura)
+        step: List[List[int]] = []
+        for j in range(len(symbols)):
+            row = [0] * len(names)
+            for i in range(len(names)):
+                bits = 0
+                for dest in trans[i][j]:
+                    bits |= eclose[dest]
+                row[i] = bits
+            step.append(row)
+        #solo importan los estados con alguna transición no-ε: dos subconjuntos con el
+        #mismo núcleo (subconjunto & live) tienen los mismos movimientos
+        live = 0
+        for i in range(len(names)):
+            if any(trans[i]):
+                live |= 1 << i
+        move_cache: Dict[int, List[int]] = {}
 
-        start_closure = frozenset(self.epsilon_closure({self.initial}))
+        start_closure = eclose[index[self.initial]]
         dfa = Automaton()
-        #map conjunto de estados nfa -> nombre estado dfa
-        mapping: Dict[FrozenSet[str], str] = {start_closure: "q0"}
-        dfa.add_state("q0", initial=True, accept=any(s in self.accepts for s in start_closure))
+        #map subconjunto nfa (bitset) -> nombre estado dfa
+        mapping: Dict[int, str] = {start_closure: "q0"}
+        dfa.add_state("q0", initial=True, accept=bool(start_closure & accept_bits))
 
-        pending: List[FrozenSet[str]] = [start_closure]
+        pending: Deque[int] = deque([start_closure])
         used_names = 1
         
         # Estado de absorción (vacío) para transiciones indefinidas
         dead_state_name = None
-        empty_set = frozenset()
 
         while pending:
-            current_set = pending.pop(0)
+            current_set = pending.popleft()
             current_name = mapping[current_set]
+            kernel = current_set & live
+            moves = move_cache.get(kernel)
+            if moves is None:
+                #bits encendidos extraídos una sola vez para todos los símbolos
+                bits_on = []
+                rest = kernel
+                while rest:
+                    low = rest & -rest
+                    bits_on.append(low.bit_length() - 1)
+                    rest ^= low
+                #movimiento: OR de las filas de cada bit encendido
+                moves = []
+                for row in step:
+                    move = 0
+                    for i in bits_on:
+                        move |= row[i]
+                    moves.append(move)
+                move_cache[kernel] = moves
             #recorremos alfabeto explícito (sin epsilon)
-            for sym in sorted(self.alphabet):
-                #calcular movimiento y luego clausura epsilon de cada destino
-                move: Set[str] = set()
-                for nfa_state in current_set:
-                    for dest in self.get_transitions(nfa_state, sym):
-                        move.update(self.epsilon_closure({dest}))
-                
+            for sym, move in zip(symbols, moves):
                 if not move:
                     # No hay transición definida, debe ir al estado de absorción
                     if dead_state_name is None:
                         dead_state_name = f"q{used_names}"
                         used_names += 1
-                        mapping[empty_set] = dead_state_name
+                        mapping[0] = dead_state_name
                         dfa.add_state(dead_state_name, accept=False)
                     dfa.add_transition(current_name, sym, dead_state_name)
                 else:
-                    frozen = frozenset(move)
-                    if frozen not in mapping:
+                    if move not in mapping:
                         new_name = f"q{used_names}"
                         used_names += 1
-                        mapping[frozen] = new_name
-                        dfa.add_state(new_name, accept=any(s in self.accepts for s in frozen))
-                        pending.append(frozen)
-                    dfa_src = current_name
-                    dfa_dst = mapping[frozen]
-                    dfa.add_transition(dfa_src, sym, dfa_dst)
+                        mapping[move] = new_name
+                        dfa.add_state(new_name, accept=bool(move & accept_bits))
+                        pending.append(move)
+                    dfa.add_transition(current_name, sym, mapping[move])
         
         # Agregar transiciones del estado de absorción hacia sí mismo para todos los símbolos
         if dead_state_name is not None:
-            for sym in sorted(self.alphabet):
+            for sym in symbols:
                 dfa.add_transition(dead_state_name, sym, dead_state_name)
 
         return dfa
@@ -228,13 +458,25 @@ class Automaton:
         new.alphabet = set(self.alphabet)
         new.initial = self.initial
         new.accepts = set(self.accepts)
-        for s, mp in self.transitions.items():
-            new.transitions[s] = {sym: set(dests) for sym, dests in mp.items()}
+        #los destinos son frozensets inmutables: basta copiar el dict por estado
+        new.transitions = {s: dict(mp) for s, mp in self.transitions.items()}
+        #la representación entera es de solo lectura: la copia la comparte hasta
+        #que se modifique
+        new._compact_cache = self._compact_cache
         return new
 
     def relabel_sequential(self) -> "Automaton":
         """Devuelve un nuevo autómata con estados renombrados a 0..n-1.
         Conserva estructura; útil para exportar en formato solicitado."""
+        return self._normalized().clone()
+
+    def _normalized(self) -> "Automaton":
+        """Vista renombrada 0..n-1 compartida (cacheada hasta modificar el autómata); no debe modificarse."""
+        if self._normalized_cache is None:
+            self._normalized_cache = self._relabel()
+        return self._normalized_cache
+
+    def _relabel(self) -> "Automaton":
         mapping: Dict[str, str] = {}
         if self.initial is not None and self.initial in self.states:
             ordered = [self.initial] + sorted(s for s in self.states if s != self.initial)
@@ -251,21 +493,88 @@ class Automaton:
                     new.add_transition(mapping[src], sym, mapping[d])
         return new
 
+    def _dense_table(self) -> Tuple[List[str], Dict[str, int], int, array, bytes, int, Optional[bytes]]:
+        """
+        Tabla de transiciones densa para simular el DFA sin diccionarios anidados.
+
+        Los estados se numeran 0..n-1 (el inicial es 0) y los símbolos 0..k-1;
+        la transición (estado, símbolo) vive en table[estado * stride + símbolo]
+        y -1 indica transición no definida. Se construye una sola vez y se
+        invalida al modificar el autómata.
+
+        Para entradas ascii, byte_lut traduce cada byte a su índice de símbolo
+        (255 = fuera del alfabeto) con un solo bytes.translate; es None si
+        algún símbolo no es ascii o el alfabeto no cabe en un byte.
+
+        Returns:
+            (nombres, índice de símbolos, stride, tabla, máscara de aceptación,
+             índice del estado de absorción o -1, byte_lut)
+        """
+        if self._dense_cache is None:
+            names = [self.initial] + sorted(s for s in self.states if s != self.initial)
+            index = {s: i for i, s in enumerate(names)}
+            sym_index = {sym: j for j, sym in enumerate(sorted(self.alphabet))}
+            stride = len(sym_index)
+            table = array("i", [-1]) * (len(names) * stride)
+            for src, mp in self.transitions.items():
+                if src not in index:
+                    continue
+                base = index[src] * stride
+                for sym, dests in mp.items():
+                    if sym in sym_index and len(dests) == 1:
+                        table[base + sym_index[sym]] = index[next(iter(dests))]
+            accepting = bytes(s in self.accepts for s in names)
+            #estado de absorción: no acepta y todos sus símbolos vuelven a él
+            dead = -1
+            if stride:
+                for q in range(len(names)):
+                    if not accepting[q] and table[q * stride:(q + 1) * stride].count(q) == stride:
+                        dead = q
+                        break
+            byte_lut = None
+            if stride < 255 and all(len(sym) == 1 and sym.isascii() for sym in sym_index):
+                lut = bytearray(b"\xff") * 256
+                for sym, j in sym_index.items():
+                    lut[ord(sym)] = j
+                byte_lut = bytes(lut)
+            self._dense_cache = (names, sym_index, stride, table, accepting, dead, byte_lut)
+        return self._dense_cache
+
     def simulate_dfa_path(self, input_str: str) -> Tuple[List[str], bool]:
         """Simula (asumiendo dfa) devolviendo la lista de estados visitados (incluye inicial) y aceptación."""
         if not self.is_deterministic():
             raise ValueError("simulate_dfa_path: requiere DFA")
         if self.initial is None:
             raise ValueError("Autómata sin inicial")
-        path = [self.initial]
-        current = self.initial
-        for ch in input_str:
-            dests = self.get_transitions(current, ch)
-            if len(dests) != 1:
-                return path, False
-            (current,) = tuple(dests)
-            path.append(current)
-        return path, current in self.accepts
+        names, sym_index, stride, table, accepting, dead, _ = self._dense_table()
+        #camino preasignado y llenado por índice; se recorta si la simulación se detiene
+        path: List[str] = [self.initial] * (len(input_str) + 1)
+        state = 0
+        for i, ch in enumerate(input_str, 1):
+            sym = sym_index.get(ch)
+            if sym is None:
+                return path[:i], False
+            state = table[state * stride + sym]
+            if state < 0:
+                return path[:i], False
+            if state == dead:
+                #atrapado en el estado de absorción: el camino no cambia hasta el
+                #primer símbolo fuera del alfabeto, donde se detiene como antes
+                end = i
+                while end < len(input_str) and input_str[end] in sym_index:
+                    end += 1
+                path[i:end + 1] = [names[dead]] * (end + 1 - i)
+                return path[:end + 1], False
+            path[i] = names[state]
+        return path, bool(accepting[state])
+
+    @property
+    def dead_state(self) -> Optional[str]:
+        """Estado de absorción del DFA (no acepta y no sale de sí mismo), o None."""
+        if self.initial is None or not self.is_deterministic():
+            return None
+        names, _, _, _, _, dead, _ = self._dense_table()
+        return names[dead] if dead >= 0 else None
 
     def remove_unreachable(self) -> None:
         if self.initial is None:
@@ -281,12 +590,23 @@ class Automaton:
                 for d in trans:
                     if d not in reachable:
                         stack.append(d)
-        #filtrar
+        self.retain_states(reachable)
+
+    def retain_states(self, keep: Iterable[str]) -> None:
+        """Elimina los estados fuera de keep, que debe ser cerrado bajo transiciones
+        (por ejemplo, los alcanzables desde el inicial)."""
+        keep = set(keep)
         for s in list(self.states):
-            if s not in reachable:
+            if s not in keep:
                 self.states.remove(s)
                 self.transitions.pop(s, None)
                 self.accepts.discard(s)
+        self._dense_cache = None
+        self._simulator_cache = None
+        self._compact_cache = None
+        self._det_cache = None
+        self._has_eps_cache = None
+        self._normalized_cache = None
 
     def is_dfa(self) -> bool:
         """
@@ -297,19 +617,8 @@ class Automaton:
         """
         if self.initial is None:
             return False
-            
-        #verificar que no hay transiciones epsilon
-        for state_transitions in self.transitions.values():
-            if EPSILON in state_transitions:
-                return False
-        
-        #verificar que cada estado tiene máximo una transición por símbolo
-        for state_transitions in self.transitions.values():
-            for dests in state_transitions.values():
-                if len(dests) > 1:
-                    return False
-        
-        return True
+        #sin ε y máximo una transición por símbolo: mismo recorrido (cacheado) que is_deterministic
+        return self.is_deterministic()
 
     def is_dead_state(self, state: str) -> bool:
         """
@@ -342,7 +651,45 @@ class Automaton:
                 
         return True
 
-    def to_dot(self, name: str = "Automaton") -> str:
+    def to_csr(self) -> Tuple[List[str], List[str], array, array, array]:
+        """Transiciones en formato CSR (filas comprimidas) sobre enteros.
+
+        Estados numerados por nombre ordenado y símbolos por el alfabeto ordenado
+        (ε se omite). Las transiciones del estado q ocupan el rango
+        [row_offsets[q], row_offsets[q + 1]) de symbols/targets, ordenadas por símbolo.
+
+        Returns:
+            (nombres, símbolos, row_offsets, symbols, targets)
+        """
+        names = sorted(self.states)
+        index = {s: i for i, s in enumerate(names)}
+        alphabet = sorted(self.alphabet)
+        sym_index = {sym: j for j, sym in enumerate(alphabet)}
+        row_offsets = array("i", [0])
+        symbols = array("i")
+        targets = array("i")
+        for src in names:
+            mp = self.transitions.get(src, {})
+            for sym in sorted(mp):
+                j = sym_index.get(sym)
+                if j is None:
+                    continue
+                for dst in sorted(mp[sym]):
+                    symbols.append(j)
+                    targets.append(index[dst])
+            row_offsets.append(len(targets))
+        return names, alphabet, row_offsets, symbols, targets
+
+    def edge_list(self) -> List[Tuple[str, str, str]]:
+        """Transiciones como tuplas (origen, símbolo, destino) en orden determinista."""
+        return [
+            (src, sym, dst)
+            for src in sorted(self.states)
+            for sym, dests in self.transitions.get(src, {}).items()
+            for dst in sorted(dests)
+        ]
+
+    def to_dot(self, name: str = "Automaton", edges: Optional[List[Tuple[str, str, str]]] = None) -> str:
         """Genera representación DOT básica del autómata"""
         lines = [f"digraph {name} {{", "rankdir=LR;"]
         #estado ficticio para flecha inicial
@@ -353,20 +700,18 @@ class Automaton:
             lines.append(f"{s} [shape={shape}];")
         if self.initial is not None:
             lines.append(f"__start__ -> {self.initial};")
-        for src in sorted(self.states):
-            for sym, dests in self.transitions[src].items():
-                label = sym
-                for dst in sorted(dests):
-                    lines.append(f"{src} -> {dst} [label=\"{label}\"]; ")
+        for src, label, dst in (self.edge_list() if edges is None else edges):
+            lines.append(f"{src} -> {dst} [label=\"{label}\"]; ")
         lines.append("}")
         return "\n".join(lines)
 
-    def to_dot_enhanced(self, name: str = "Automaton") -> str:
+    def to_dot_enhanced(self, name: str = "Automaton", edges: Optional[List[Tuple[str, str, str]]] = None) -> str:
         """
         Genera representación DOT mejorada con estilos y colores.
         
         Args:
             name: Nombre del grafo
+            edges: Transiciones ya serializadas (por defecto edge_list())
             
         Returns:
             Código DOT con estilos mejorados
@@ -384,36 +729,40 @@ class Automaton:
         if self.initial is not None:
             lines.append("__start__ [shape=point, width=0.1, height=0.1];")
         
-        #estados con colores y estilos
+        #estados con colores y estilos: el atributo de cada combinación
+        #(inicial, aceptación, absorción) se arma una sola vez
+        node_attrs: Dict[Tuple[bool, bool, bool], str] = {}
         for s in sorted(self.states):
-            is_initial = (s == self.initial)
-            is_accept = (s in self.accepts)
-            is_dead = self.is_dead_state(s)
-            
-            if is_accept:
-                shape = "doublecircle"
-                color = "lightcoral"
-                fontcolor = "darkred"
-            elif is_dead:
-                shape = "circle"
-                color = "yellow"
-                fontcolor = "black"
-            else:
-                shape = "circle"
-                color = "lightblue"
-                fontcolor = "darkblue"
-            
-            if is_initial:
-                color = "lightgreen"
-                fontcolor = "darkgreen"
+            is_accept = s in self.accepts
+            key = (s == self.initial, is_accept, not is_accept and self.is_dead_state(s))
+            attrs = node_attrs.get(key)
+            if attrs is None:
+                is_initial, _, is_dead = key
                 if is_accept:
-                    color = "gold"
-                    fontcolor = "darkorange"
-            
-            lines.append(
-                f'{s} [shape={shape}, style=filled, fillcolor="{color}", '
-                f'fontcolor="{fontcolor}", penwidth=2];'
-            )
+                    shape = "doublecircle"
+                    color = "lightcoral"
+                    fontcolor = "darkred"
+                elif is_dead:
+                    shape = "circle"
+                    color = "yellow"
+                    fontcolor = "black"
+                else:
+                    shape = "circle"
+                    color = "lightblue"
+                    fontcolor = "darkblue"
+                
+                if is_initial:
+                    color = "lightgreen"
+                    fontcolor = "darkgreen"
+                    if is_accept:
+                        color = "gold"
+                        fontcolor = "darkorange"
+                
+                attrs = node_attrs[key] = (
+                    f'[shape={shape}, style=filled, fillcolor="{color}", '
+                    f'fontcolor="{fontcolor}", penwidth=2];'
+                )
+            lines.append(f"{s} {attrs}")
         
         #flecha inicial con estilo
         if self.initial is not None:
@@ -422,27 +771,19 @@ class Automaton:
         lines.append("")
         
         #agrupar transiciones por par (src, dst) para combinar etiquetas
-        edge_labels = {}
-        for src in self.states:
-            for sym, dests in self.transitions.get(src, {}).items():
-                for dst in dests:
-                    key = (src, dst)
-                    if key not in edge_labels:
-                        edge_labels[key] = []
-                    edge_labels[key].append(sym)
+        edge_labels: Dict[Tuple[str, str], List[str]] = {}
+        for src, sym, dst in (self.edge_list() if edges is None else edges):
+            edge_labels.setdefault((src, dst), []).append(sym)
         
-        #generar transiciones con etiquetas combinadas
-        for (src, dst), symbols in edge_labels.items():
-            #combinar símbolos múltiples con comas
-            label = ", ".join(sorted(symbols))
-            
-            #estilo de la transición
-            if EPSILON in symbols:
-                style = 'style=dashed, color=gray'
-            else:
-                style = 'color=black'
-            
-            lines.append(f'{src} -> {dst} [label="{label}", {style}];')
+        #transiciones con etiquetas combinadas (símbolos separados por comas);
+        #las que incluyen ε van punteadas
+        epsilon_style = "style=dashed, color=gray"
+        plain_style = "color=black"
+        lines.extend(
+            f'{src} -> {dst} [label="{", ".join(sorted(symbols))}", '
+            f'{epsilon_style if EPSILON in symbols else plain_style}];'
+            for (src, dst), symbols in edge_labels.items()
+        )
         
         lines.append("}")
         return "\n".join(lines)
@@ -0,0 +1,92 @@
+from __future__ import annotations
+from typing import Callable, Dict, List, Optional, Tuple
+from .automaton import Automaton
+
+#generación en tiempo de ejecución de un simulador especializado para un DFA.
+#cada estado se vuelve una rama if/elif con los símbolos como constantes, de modo
+#que el ciclo por carácter no pasa por búsquedas genéricas en diccionarios.
+
+Simulator = Callable[[str], Tuple[List[str], bool]]
+
+#con más símbolos por estado se usa un dict constante en vez de una cadena de ifs
+_MAX_INLINE_SYMBOLS = 8
+#con más estados la cadena de ramas por estado deja de compensar y se indexa una tupla de dicts
+_MAX_INLINE_STATES = 64
+#con menos cadenas generar y compilar el simulador cuesta más de lo que ahorra
+_MIN_CODEGEN_STRINGS = 8
+
+
+def _generate_source(dfa: Automaton) -> Tuple[str, Dict[str, object]]:
+    """Devuelve el código fuente de run(w) y las constantes que necesita."""
+    names, sym_index, stride, table, accepting, dead, _ = dfa._dense_table()
+    symbols = sorted(sym_index, key=sym_index.get)
+    consts: Dict[str, object] = {
+        "NAMES": tuple(names),
+        "ACCEPTING": tuple(bool(a) for a in accepting),
+        "DEAD": dead,
+        "SYMBOLS": frozenset(symbols),
+    }
+    lines = [
+        "def run(w):",
+        "    path = [NAMES[0]] * (len(w) + 1)",
+        "    s = 0",
+        "    i = 0",
+        "    for c in w:",
+    ]
+    if len(names) > _MAX_INLINE_STATES:
+        consts["T"] = tuple(
+            {sym: table[q * stride + j] for j, sym in enumerate(symbols) if table[q * stride + j] >= 0}
+            for q in range(len(names))
+        )
+        lines.append("        s = T[s].get(c, -1)")
+    for q in range(len(names) if len(names) <= _MAX_INLINE_STATES else 0):
+        edges = [(sym, table[q * stride + j]) for j, sym in enumerate(symbols) if table[q * stride + j] >= 0]
+        lines.append(f"        {'if' if q == 0 else 'elif'} s == {q}:")
+        if not edges:
+            lines.append("            s = -1")
+        elif len(edges) <= _MAX_INLINE_SYMBOLS:
+            for k, (sym, dst) in enumerate(edges):
+                lines.append(f"            {'if' if k == 0 else 'elif'} c == {sym!r}:")
+                lines.append(f"                s = {dst}")
+            lines.append("            else:")
+            lines.append("                s = -1")
+        else:
+            consts[f"T{q}"] = dict(edges)
+            lines.append(f"            s = T{q}.get(c, -1)")
+    lines += [
+        "        if s < 0:",
+        "            return path[:i + 1], False",
+        "        if s == DEAD:",
+        "            j = i + 1",
+        "            while j < len(w) and w[j] in SYMBOLS:",
+        "                j += 1",
+        "            path[i + 1:j + 1] = [NAMES[DEAD]] * (j - i)",
+        "            return path[:j + 1], False",
+        "        i += 1",
+        "        path[i] = NAMES[s]",
+        "    return path, ACCEPTING[s]",
+    ]
+    return "\n".join(lines) + "\n", consts
+
+
+def codegen_simulator(dfa: Automaton, expected_strings: Optional[int] = None) -> Simulator:
+    """Devuelve una función run(w) -> (camino, aceptada) equivalente a simulate_dfa_path.
+
+    El código se genera y compila una vez por autómata y se guarda en el propio
+    autómata; cualquier modificación posterior lo invalida. Si expected_strings
+    indica pocas cadenas (None = desconocido) y el simulador aún no existe, se
+    devuelve simulate_dfa_path, que no tiene costo de generación.
+    """
+    if not dfa.is_deterministic():
+        raise ValueError("codegen_simulator: requiere DFA")
+    if dfa.initial is None:
+        raise ValueError("Autómata sin inicial")
+    if dfa._simulator_cache is None:
+        if expected_strings is not None and expected_strings < _MIN_CODEGEN_STRINGS:
+            return dfa.simulate_dfa_path
+        source, namespace = _generate_source(dfa)
+        exec(compile(source, "<dfa simulator>", "exec"), namespace)
+        dfa._simulator_cache = namespace["run"]
+    return dfa._simulator_cache
+
+__all__ = ["codegen_simulator"]
@@ -1,32 +1,65 @@
 from __future__ import annotations
 import json
+import os
+import shutil
 import subprocess
+import tempfile
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Tuple, Optional
 from .automaton import Automaton, EPSILON
 
-def automaton_to_dict(a: Automaton) -> dict:
+#orjson es opcional: si está instalado se usa para serializar, con la misma salida que json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dumps(data: dict) -> bytes:
+    """Serializa a JSON con sangría de 2 espacios en UTF-8"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+def _serialize_once(a: Automaton) -> Tuple[List[str], List[str], List[Tuple[str, str, str]]]:
+    """
+    Recorre el autómata una sola vez para todos los formatos de exportación.
+    
+    Returns:
+        (estados en orden secuencial con el inicial primero, aceptaciones, transiciones)
+    """
+    if a.initial is not None and a.initial in a.states:
+        states = [a.initial] + sorted(s for s in a.states if s != a.initial)
+    else:
+        states = sorted(a.states)
+    accepts = [s for s in states if s in a.accepts]
+    return states, accepts, a.edge_list()
+
+
+def automaton_to_dict(a: Automaton, serialized: Optional[Tuple] = None) -> dict:
     """
     Convierte un autómata a diccionario para exportación JSON.
     
     Args:
         a: El autómata a convertir
+        serialized: Resultado de _serialize_once si ya se calculó
         
     Returns:
         Diccionario con formato estándar del proyecto
     """
-    norm = a.relabel_sequential()
-    trans_list = []
-    for src, mp in norm.transitions.items():
-        for sym, dests in mp.items():
-            for d in dests:
-                label = "" if sym == EPSILON else sym
-                trans_list.append((int(src), label, int(d)))
+    states, accepts, edges = serialized if serialized is not None else _serialize_once(a)
+    #estados renombrados a 0..n-1 como en relabel_sequential
+    index = {s: i for i, s in enumerate(states)}
+    trans_list = sorted(
+        (index[src], "" if sym == EPSILON else sym, index[dst])
+        for src, sym, dst in edges
+    )
     return {
-        "ESTADOS": [int(s) for s in sorted(norm.states, key=lambda x: int(x))],
-        "SIMBOLOS": sorted(sym for sym in norm.alphabet),
-        "INICIO": [int(norm.initial)] if norm.initial is not None else [],
-        "ACEPTACION": [int(s) for s in sorted(norm.accepts, key=lambda x: int(x))],
+        "ESTADOS": list(range(len(states))),
+        "SIMBOLOS": sorted(sym for sym in a.alphabet),
+        "INICIO": [0] if a.initial is not None and a.initial in index else [],
+        "ACEPTACION": [index[s] for s in accepts],
         "TRANSICIONES": trans_list,
     }
 
@@ -39,9 +72,8 @@ def export_json(a: Automaton, path: str) -> None:
         a: El autómata a exportar
         path: Ruta del archivo de salida
     """
-    data = automaton_to_dict(a)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    with open(path, "wb") as f:
+        f.write(_dumps(automaton_to_dict(a)))
 
 
 def export_dot(a: Automaton, path: str, enhanced: bool = True) -> None:
@@ -62,6 +94,12 @@ def export_dot(a: Automaton, path: str, enhanced: bool = True) -> None:
         f.write(dot_content)
 
 
+@lru_cache(maxsize=1)
+def _dot_executable() -> Optional[str]:
+    """Ruta del ejecutable dot de Graphviz (se busca una sola vez por proceso)"""
+    return shutil.which("dot")
+
+
 def export_image(a: Automaton, path: str, format: str = "png", enhanced: bool = True) -> bool:
     """
     Exporta un autómata como imagen usando Graphviz.
@@ -75,26 +113,110 @@ def export_image(a: Automaton, path: str, format: str = "png", enhanced: bool =
     Returns:
         True si la exportación fue exitosa
     """
-    if enhanced:
-        dot_content = a.to_dot_enhanced()
-    else:
-        dot_content = a.to_dot()
+    return export_images([(a, path)], format=format, enhanced=enhanced)[0]
+
+
+def export_images(items: List[Tuple[Automaton, str]], format: str = "png", enhanced: bool = True) -> List[bool]:
+    """
+    Exporta varios autómatas como imagen con una sola invocación de Graphviz.
     
-    # Reemplazar epsilon para compatibilidad
-    dot_content_safe = dot_content.replace("ε", "epsilon")
+    Cada grafo se escribe en un archivo temporal sin extensión y se renderiza
+    con `dot -O`, que nombra la salida como <archivo>.<formato>; así un solo
+    proceso genera todas las imágenes.
     
+    Args:
+        items: Pares (autómata, ruta de salida)
+        format: Formato de imagen (png, svg, pdf)
+        enhanced: Si usar visualización mejorada
+        
+    Returns:
+        Lista con True por cada imagen generada correctamente
+    """
+    sources = [a.to_dot_enhanced() if enhanced else a.to_dot() for a, _ in items]
+    return _render_dot_sources(sources, [path for _, path in items], format)
+
+
+def _render_dot_sources(sources: List[str], paths: List[str], format: str = "png") -> List[bool]:
+    """Renderiza varios fuentes DOT a sus rutas con un solo proceso dot"""
+    dot = _dot_executable()
+    if dot is None or not sources:
+        return [False] * len(sources)
+    
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        files = []
+        for i, dot_content in enumerate(sources):
+            # Reemplazar epsilon para compatibilidad
+            source = Path(tmp) / f"graph{i}"
+            source.write_text(dot_content.replace("ε", "epsilon"), encoding="utf-8")
+            files.append(source)
+        
+        try:
+            subprocess.run(
+                [dot, f"-T{format}", "-O", *(str(f) for f in files)],
+                capture_output=True,
+                check=False
+            )
+        except OSError:
+            return [False] * len(sources)
+        
+        for source, path in zip(files, paths):
+            rendered = source.with_name(f"{source.name}.{format}")
+            if rendered.exists():
+                shutil.move(str(rendered), path)
+                results.append(True)
+            else:
+                results.append(False)
+    return results
+
+
+def _write_if_changed(path: str, payload: bytes) -> None:
+    """Escribe el archivo solo si su contenido en disco es distinto de payload"""
     try:
-        result = subprocess.run(
-            ["dot", f"-T{format}", "-o", path],
-            input=dot_content_safe,
-            text=True,
-            capture_output=True,
-            check=True,
-            encoding='utf-8'
-        )
-        return True
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        return False
+        with open(path, "rb") as f:
+            #un tamaño distinto basta para saber que cambió, sin leer el archivo
+            if os.fstat(f.fileno()).st_size == len(payload) and f.read() == payload:
+                return
+    except OSError:
+        pass
+    with open(path, "wb") as f:
+        f.write(payload)
+
+
+def export_all(items: List[Tuple[Automaton, str]], enhanced: bool = True,
+               formats: Tuple[str, ...] = ("json", "dot", "png")) -> List[bool]:
+    """
+    Exporta varios autómatas en todos los formatos pedidos recorriéndolos una vez.
+    
+    Cada autómata se serializa una sola vez y ese resultado alimenta al JSON y
+    al DOT; el texto DOT se reutiliza para la imagen y todas las imágenes se
+    generan con una única invocación de Graphviz.
+    
+    Args:
+        items: Pares (autómata, ruta base sin extensión)
+        enhanced: Si usar formato DOT mejorado
+        formats: Formatos a generar ("json", "dot" y/o un formato de imagen)
+        
+    Returns:
+        Lista con True por cada imagen generada correctamente
+    """
+    image_formats = [f for f in formats if f not in ("json", "dot")]
+    dot_sources = []
+    for a, base in items:
+        serialized = _serialize_once(a)
+        if "json" in formats:
+            _write_if_changed(f"{base}.json", _dumps(automaton_to_dict(a, serialized)))
+        if "dot" in formats or image_formats:
+            edges = serialized[2]
+            dot_content = a.to_dot_enhanced(edges=edges) if enhanced else a.to_dot(edges=edges)
+            dot_sources.append(dot_content)
+            if "dot" in formats:
+                _write_if_changed(f"{base}.dot", dot_content.encode("utf-8"))
+    
+    rendered = [False] * len(items)
+    for image_format in image_formats:
+        rendered = _render_dot_sources(dot_sources, [f"{base}.{image_format}" for _, base in items], image_format)
+    return rendered
 
 
 def export_interactive_html(a: Automaton, path: str, include_simulation: bool = True) -> bool:
@@ -223,7 +345,8 @@ def _generate_interactive_html(a: Automaton, include_simulation: bool) -> str:
 
 def _automaton_to_visjs(a: Automaton) -> Tuple[List[dict], List[dict]]:
     """Convierte autómata a formato vis.js"""
-    norm = a.relabel_sequential()
+    #vista renombrada compartida: solo se lee
+    norm = a._normalized()
     
     nodes = []
     for state in norm.states:
@@ -355,6 +478,6 @@ def _generate_simulation_html(a: Automaton, string: str, steps: List[dict]) -> s
 
 
 __all__ = [
-    "export_json", "automaton_to_dict", "export_dot", "export_image",
+    "export_json", "automaton_to_dict", "export_dot", "export_image", "export_images", "export_all",
     "export_interactive_html", "export_step_by_step_simulation"
 ]
@@ -1,90 +1,180 @@
 from __future__ import annotations
-from typing import Dict, Set, FrozenSet, List
+from array import array
+from collections import deque
+from typing import Deque, Dict, Set, List, Tuple
 from .automaton import Automaton
+from .valmari import minimize_valmari
 
 #minimización de Hopcroft para DFA
 
-def minimize_hopcroft(dfa: Automaton) -> Automaton:
+def _build_delta_soa(dfa: Automaton, assume_reachable: bool = False) -> Tuple[List[str], List[str], array]:
+    """δ del DFA como un solo arreglo plano: delta[q*k + a] = destino, -1 si no hay.
+
+    Estados numerados por nombre ordenado y símbolos por el alfabeto ordenado.
+    Salvo con assume_reachable=True, la búsqueda de alcanzables recorre el mismo
+    arreglo y los estados inalcanzables se eliminan también de dfa (como
+    remove_unreachable), así el DFA se lee una sola vez.
+
+    Returns:
+        (nombres, símbolos, delta)
+    """
+    names, alphabet, row_offsets, symbols, targets = dfa.to_csr()
+    n = len(names)
+    k = len(alphabet)
+    delta = array("i", [-1]) * (n * k)
+    for q in range(n):
+        base = q * k
+        for t in range(row_offsets[q], row_offsets[q + 1]):
+            delta[base + symbols[t]] = targets[t]
+    if assume_reachable or dfa.initial is None:
+        return names, alphabet, delta
+
+    seen = bytearray(n)
+    start = names.index(dfa.initial)
+    seen[start] = 1
+    stack = [start]
+    while stack:
+        base = stack.pop() * k
+        for d in delta[base:base + k]:
+            if d >= 0 and not seen[d]:
+                seen[d] = 1
+                stack.append(d)
+    if seen.count(1) == n:
+        return names, alphabet, delta
+
+    #renumerar solo los alcanzables y podar el DFA original
+    keep = [q for q in range(n) if seen[q]]
+    new_id = array("i", [-1]) * n
+    for i, q in enumerate(keep):
+        new_id[q] = i
+    pruned = array("i", [-1]) * (len(keep) * k)
+    for i, q in enumerate(keep):
+        for a in range(k):
+            d = delta[q * k + a]
+            if d >= 0:
+                pruned[i * k + a] = new_id[d]
+    reachable = [names[q] for q in keep]
+    dfa.retain_states(reachable)
+    return reachable, alphabet, pruned
+
+
+def minimize_hopcroft(dfa: Automaton, assume_reachable: bool = False) -> Automaton:
+    """Minimiza un DFA con el algoritmo de Hopcroft.
+
+    Con assume_reachable=True se omite la pasada de remove_unreachable: sirve
+    cuando el DFA viene de la construcción de subconjuntos,
+    que solo genera estados alcanzables.
+
+    Hopcroft supone δ total; un DFA parcial (transiciones faltantes) se delega
+    a Valmari-Lehtinen, que refina sobre las transiciones existentes.
+    """
     if not dfa.is_deterministic():
         raise ValueError("minimize_hopcroft requiere un DFA determinista")
     if dfa.initial is None:
         raise ValueError("DFA sin estado inicial")
 
-    dfa.remove_unreachable()
+    names, alphabet, delta = _build_delta_soa(dfa, assume_reachable)
+    sid = {s: i for i, s in enumerate(names)}
+    n = len(names)
+    k = len(alphabet)
+    if -1 in delta:
+        #con transiciones faltantes el truco de la mitad pequeña no es válido
+        return minimize_valmari(dfa, assume_reachable=True)
+
+    #preimagen por símbolo: inv[a][d] = estados q con δ(q, a) = d
+    inv: List[List[List[int]]] = [[[] for _ in range(n)] for _ in range(k)]
+    for q in range(n):
+        base = q * k
+        for a in range(k):
+            d = delta[base + a]
+            if d >= 0:
+                inv[a][d].append(q)
 
-    alphabet = sorted(dfa.alphabet)
-    F = set(dfa.accepts)
-    Q = set(dfa.states)
-    NF = Q - F
+    #partición inicial (sin bloques vacíos): bloques como conjuntos de ids y
+    #block_of[q] = bloque actual de q
+    accepting = [s in dfa.accepts for s in names]
+    P: List[Set[int]] = [block for block in (
+        {q for q in range(n) if accepting[q]},
+        {q for q in range(n) if not accepting[q]},
+    ) if block]
+    block_of = array("i", [0]) * n
+    for bid, block in enumerate(P):
+        for q in block:
+            block_of[q] = bid
 
-    #partición inicial
-    P: List[Set[str]] = [F, NF] if NF else [F]
-    W: List[Set[str]] = [F.copy()]
+    #worklist de pares (bloque, símbolo): deque para FIFO y set para pertenencia O(1)
+    W: Deque[Tuple[int, int]] = deque()
+    in_W: Set[Tuple[int, int]] = set()
 
-    def target(src: str, sym: str) -> str | None:
-        ts = dfa.transitions.get(src, {}).get(sym, set())
-        if len(ts) == 1:
-            return next(iter(ts))
-        return None
+    def push(bid: int, sym: int) -> None:
+        if (bid, sym) not in in_W:
+            in_W.add((bid, sym))
+            W.append((bid, sym))
+
+    if len(P) == 2:
+        smaller = 0 if len(P[0]) <= len(P[1]) else 1
+        for sym in range(k):
+            push(smaller, sym)
 
     while W:
-        A = W.pop()
-        for sym in alphabet:
-            #preimagen de A bajo sym
-            X = {q for q in Q if target(q, sym) in A}
-            if not X:
+        bid, sym = W.popleft()
+        in_W.discard((bid, sym))
+        #predecesores de A bajo sym agrupados por su bloque actual: solo se
+        #visitan los bloques tocados, no toda la partición
+        inv_sym = inv[sym]
+        touched: Dict[int, List[int]] = {}
+        for d in P[bid]:
+            for q in inv_sym[d]:
+                hits = touched.get(block_of[q])
+                if hits is None:
+                    touched[block_of[q]] = [q]
+                else:
+                    hits.append(q)
+        for yid, hits in touched.items():
+            Y = P[yid]
+            if len(hits) == len(Y):
                 continue
-            new_P: List[Set[str]] = []
-            for Y in P:
-                inter = Y & X
-                diff = Y - X
-                if inter and diff:
-                    new_P.append(inter)
-                    new_P.append(diff)
-                    if Y in W:
-                        W.remove(Y)
-                        W.append(inter)
-                        W.append(diff)
-                    else:
-                        #añadir la parte más pequeña a W
-                        if len(inter) <= len(diff):
-                            W.append(inter)
-                        else:
-                            W.append(diff)
+            #los estados tocados pasan a un bloque nuevo: O(|hits|)
+            Y.difference_update(hits)
+            new_id = len(P)
+            P.append(set(hits))
+            for q in hits:
+                block_of[q] = new_id
+            small = new_id if len(hits) <= len(Y) else yid
+            for c in range(k):
+                if (yid, c) in in_W:
+                    #(Y, c) pendiente: ambas mitades deben procesarse
+                    push(new_id, c)
                 else:
-                    new_P.append(Y)
-            P = new_P
+                    #invariante de Hopcroft: solo la mitad más pequeña
+                    push(small, c)
 
     # Construcción del DFA mínimo
     # Elegir nombres: si el bloque tiene tamaño 1 conservar el nombre original
     # Si se fusionan varios, crear nombre nuevo "mX"
-    rep_map: Dict[str, str] = {}
-    block_names: Dict[FrozenSet[str], str] = {}
+    block_name: List[str] = []
     mcount = 0
-    for block in P:
-        bset = frozenset(block)
-        if len(block) == 1:
-            name = next(iter(block))
+    for ids in P:
+        if len(ids) == 1:
+            block_name.append(names[next(iter(ids))])
         else:
-            name = f"m{mcount}"
+            block_name.append(f"m{mcount}")
             mcount += 1
-        block_names[bset] = name
-        for s in block:
-            rep_map[s] = name
 
+    #los bloques son homogéneos en aceptación: basta mirar un estado de cada uno
+    initial_block = block_of[sid[dfa.initial]]
     min_dfa = Automaton()
-    for block in P:
-        bset = frozenset(block)
-        name = block_names[bset]
-        accept = any(s in F for s in block)
-        initial = dfa.initial in block
-        min_dfa.add_state(name, accept=accept, initial=initial)
-    for s, mp in dfa.transitions.items():
-        for sym, dests in mp.items():
-            if len(dests) != 1:
-                continue
-            (d,) = tuple(dests)
-            min_dfa.add_transition(rep_map[s], sym, rep_map[d])
+    for bid, ids in enumerate(P):
+        min_dfa.add_state(block_name[bid], accept=accepting[next(iter(ids))], initial=bid == initial_block)
+    #los estados de un bloque son equivalentes: basta con las transiciones de
+    #un representante por bloque, O(|P|·|Σ|) en vez de O(|δ|)
+    for bid, ids in enumerate(P):
+        base = next(iter(ids)) * k
+        src = block_name[bid]
+        for a in range(k):
+            d = delta[base + a]
+            if d >= 0:
+                min_dfa.add_transition(src, alphabet[a], block_name[block_of[d]])
     return min_dfa
 
 __all__ = ["minimize_hopcroft"]
@@ -1,5 +1,6 @@
 from __future__ import annotations
-from typing import List, Set
+from functools import lru_cache
+from typing import Dict, Iterator, List, Tuple
 import re
 import string
 
@@ -16,6 +17,57 @@ EPSILON_SYMBOLS = {"ε"}
 SPECIAL_CHARS = {"|", "*", "+", "?", "(", ")", "[", "]", "{", "}", "\\", "^", "$", ".", "-"}
 VALID_ESCAPE_CHARS = {"n", "t", "r", "\\", "(", ")", "[", "]", "{", "}", "|", "*", "+", "?", ".", "^", "$"}
 
+#clase de cada caracter ascii para to_postfix: un indice por caracter en vez de varios `in`
+CLS_OPERAND = 0
+CLS_ALT = 1
+CLS_CONCAT = 2
+CLS_UNARY = 3
+CLS_OPEN = 4
+CLS_CLOSE = 5
+
+_CLASS_LUT = bytearray(128)
+_CLASS_LUT[ord("|")] = CLS_ALT
+_CLASS_LUT[ord(".")] = CLS_CONCAT
+_CLASS_LUT[ord("*")] = _CLASS_LUT[ord("+")] = _CLASS_LUT[ord("?")] = CLS_UNARY
+_CLASS_LUT[ord("(")] = CLS_OPEN
+_CLASS_LUT[ord(")")] = CLS_CLOSE
+
+#banderas en los bits altos de la misma tabla (la clase ocupa los 3 bits bajos)
+CLS_MASK = 7
+CAT_NO_CONCAT_AFTER = 8  #despues de | o ( no se concatena
+CAT_NO_CONCAT_BEFORE = 16  #antes de |, ) o un unario no se concatena
+CAT_RIGHT_ASSOC = 32
+
+_CLASS_LUT[ord("|")] |= CAT_NO_CONCAT_AFTER | CAT_NO_CONCAT_BEFORE
+_CLASS_LUT[ord("(")] |= CAT_NO_CONCAT_AFTER
+_CLASS_LUT[ord(")")] |= CAT_NO_CONCAT_BEFORE
+for _op in RIGHT_ASSOC:
+    _CLASS_LUT[ord(_op)] |= CAT_NO_CONCAT_BEFORE | CAT_RIGHT_ASSOC
+
+#precedencia en los 2 bits mas altos de la misma tabla (0 = no es operador)
+PREC_SHIFT = 6
+PREC_BITS = 3 << PREC_SHIFT
+for _op, _prec in PRECEDENCE.items():
+    _CLASS_LUT[ord(_op)] |= _prec << PREC_SHIFT
+
+#caracteres ascii que el paso 5 acepta siempre (se borran con translate)
+_ALLOWED_ASCII = str.maketrans("", "", string.ascii_letters + string.digits + "|*+?() \n\t\r\\.")
+
+#codigo -> caracter de operador para vaciar la pila del shunting yard
+_OP_CHARS = [chr(code) for code in range(128)]
+_OPEN_CODE = ord("(")
+
+#escapes o clases [..] completas (grupo 2 vacio si falta el cierre)
+_CLASS_RE = re.compile(r"\\.|\[((?:\\.|[^\\\]])*)(\])?", re.DOTALL)
+#escapes (grupo 1) o el punto "cualquier caracter"
+_SPECIAL_RE = re.compile(r"\\(.)|\.", re.DOTALL)
+_ESCAPE_CONTROL = {"n": "\n", "t": "\t", "r": "\r"}
+#punto = cualquier caracter (simplificado a letras y digitos), armado una sola vez
+_ANY_CHAR_EXPANSION = "(" + "|".join(string.ascii_letters + string.digits) + ")"
+
+#escapes (con su caracter, si lo hay), delimitadores y operadores, en orden de aparicion
+_VALIDATE_RE = re.compile(r"\\(.)?|[()\[\]{}*+?|]", re.DOTALL)
+
 class RegexValidationError(ValueError):
     """Excepcion especifica para errores de validacion de regex"""
     pass
@@ -37,24 +89,31 @@ def validate_regex(regex: str) -> None:
     if len(regex) > 1000:
         raise RegexValidationError("Regex demasiado larga (maximo 1000 caracteres)")
     
-    #verificar parentesis balanceados
+    #una sola pasada: el recorrido lo hace re en C y solo llegan a Python los
+    #escapes, los delimitadores y los operadores
     paren_count = 0
     bracket_count = 0
     brace_count = 0
+    #el primer error de posicion de operador se reporta despues de los de balance
+    operator_error = None
+    prev_end = -1  #fin del token anterior: si coincide con el inicio, son adyacentes
+    prev_char = ""  #caracter logico del token anterior (un escape cuenta como literal)
     
-    i = 0
-    while i < len(regex):
-        char = regex[i]
+    for match in _VALIDATE_RE.finditer(regex):
+        char = match.group()
+        start, end = match.span()
+        prev = prev_char if prev_end == start else ""
+        prev_end = end
+        prev_char = char
         
-        if char == '\\':
+        if char[0] == '\\':
             #verificar escape valido
-            if i + 1 >= len(regex):
+            next_char = match.group(1)
+            if next_char is None:
                 raise RegexValidationError("Backslash al final de regex")
-            next_char = regex[i + 1]
             if next_char not in VALID_ESCAPE_CHARS:
                 raise RegexValidationError(f"Escape invalido: \\{next_char}")
-            i += 2
-            continue
+            prev_char = "a"
             
         elif char == '(':
             paren_count += 1
@@ -77,7 +136,19 @@ def validate_regex(regex: str) -> None:
             if brace_count < 0:
                 raise RegexValidationError("Llaves desbalanceadas: '}' sin '{' correspondiente")
         
-        i += 1
+        elif operator_error is not None:
+            continue
+        elif char == '|':
+            if start == 0 or end == len(regex):
+                operator_error = "Operador '|' en posicion invalida"
+            elif prev in {'|', '('} or regex[end] in {'|', ')'}:
+                operator_error = "Operador '|' mal posicionado"
+        else:
+            #operador unario * + ?
+            if start == 0:
+                operator_error = f"Operador '{char}' al inicio de regex"
+            elif prev in {'|', '('}:
+                operator_error = f"Operador '{char}' despues de '{prev}'"
     
     if paren_count != 0:
         raise RegexValidationError("Parentesis desbalanceados: '(' sin ')' correspondiente")
@@ -87,40 +158,16 @@ def validate_regex(regex: str) -> None:
         raise RegexValidationError("Llaves desbalanceadas: '{' sin '}' correspondiente")
     
     #verificar operadores validos
-    _validate_operators(regex)
+    if operator_error is not None:
+        raise RegexValidationError(operator_error)
 
 
-def _validate_operators(regex: str) -> None:
-    """Valida que los operadores esten en posiciones correctas"""
-    cleaned_regex = _remove_escapes(regex)
-    
-    for i, char in enumerate(cleaned_regex):
-        if char in {'*', '+', '?'}:
-            if i == 0:
-                raise RegexValidationError(f"Operador '{char}' al inicio de regex")
-            prev_char = cleaned_regex[i-1]
-            if prev_char in {'|', '('}:
-                raise RegexValidationError(f"Operador '{char}' despues de '{prev_char}'")
-        
-        elif char == '|':
-            if i == 0 or i == len(cleaned_regex) - 1:
-                raise RegexValidationError("Operador '|' en posicion invalida")
-            if cleaned_regex[i-1] in {'|', '('} or cleaned_regex[i+1] in {'|', ')'}:
-                raise RegexValidationError("Operador '|' mal posicionado")
-
-
-def _remove_escapes(regex: str) -> str:
-    """Remueve caracteres escapados para validacion de operadores"""
-    result = []
-    i = 0
-    while i < len(regex):
-        if regex[i] == '\\' and i + 1 < len(regex):
-            result.append('a')  #reemplazar escape con simbolo generico
-            i += 2
-        else:
-            result.append(regex[i])
-            i += 1
-    return ''.join(result)
+def _check_allowed_chars(text: str) -> None:
+    """Rechaza el primer caracter de text que no sea simbolo u operador"""
+    #translate descarta en C los ascii permitidos; solo el resto se revisa
+    for char in text.translate(_ALLOWED_ASCII):
+        if not char.isalnum():
+            raise RegexValidationError(f"Caracter no valido: '{char}'")
 
 
 def expand_character_classes(regex: str) -> str:
@@ -133,36 +180,34 @@ def expand_character_classes(regex: str) -> str:
     Returns:
         Regex expandida sin clases de caracteres
     """
-    result = []
-    i = 0
-    
-    while i < len(regex):
-        if regex[i] == '\\' and i + 1 < len(regex):
-            #manejar escape
-            result.append(regex[i:i+2])
-            i += 2
-        elif regex[i] == '[':
-            #encontrar el cierre del corchete
-            j = i + 1
-            while j < len(regex) and regex[j] != ']':
-                if regex[j] == '\\':
-                    j += 2
-                else:
-                    j += 1
-            
-            if j >= len(regex):
-                raise RegexValidationError("Clase de caracteres sin cerrar")
-            
-            #expandir la clase
-            char_class = regex[i+1:j]
-            expanded = _expand_char_class(char_class)
-            result.append(f"({expanded})")
-            i = j + 1
-        else:
-            result.append(regex[i])
-            i += 1
-    
-    return ''.join(result)
+    #re recorre la cadena en C: solo escapes y clases llegan a Python
+    return _CLASS_RE.sub(_replace_class, regex)
+
+
+def _replace_class(match: "re.Match[str]") -> str:
+    """Callback de expand_character_classes: los escapes quedan igual"""
+    char_class = match.group(1)
+    if char_class is None:
+        return match.group()
+    if match.group(2) is None:
+        raise RegexValidationError("Clase de caracteres sin cerrar")
+    return f"({_expand_char_class(char_class)})"
+
+
+def _range_mask(lo: int, hi: int) -> int:
+    """Mapa de bits con los code points lo..hi encendidos"""
+    return ((1 << (hi + 1)) - 1) ^ ((1 << lo) - 1)
+
+
+def _mask_intervals(mask: int) -> Iterator[Tuple[int, int]]:
+    """Rachas de bits encendidos de mask como intervalos (lo, hi) ordenados"""
+    while mask:
+        lo = (mask & -mask).bit_length() - 1
+        run = mask >> lo
+        #el primer cero por encima de lo marca el fin de la racha
+        hi = lo + (~run & (run + 1)).bit_length() - 2
+        mask &= ~((1 << (hi + 1)) - 1)
+        yield lo, hi
 
 
 def _expand_char_class(char_class: str) -> str:
@@ -170,7 +215,8 @@ def _expand_char_class(char_class: str) -> str:
     if not char_class:
         raise RegexValidationError("Clase de caracteres vacia")
     
-    chars = set()
+    #mapa de bits de code points: un rango es una sola mascara, sin ordenar ni fusionar
+    mask = 0
     i = 0
     
     while i < len(char_class):
@@ -178,13 +224,14 @@ def _expand_char_class(char_class: str) -> str:
             #caracter escapado
             next_char = char_class[i + 1]
             if next_char == 'n':
-                chars.add('\n')
+                code = 10
             elif next_char == 't':
-                chars.add('\t')
+                code = 9
             elif next_char == 'r':
-                chars.add('\r')
+                code = 13
             else:
-                chars.add(next_char)
+                code = ord(next_char)
+            mask |= 1 << code
             i += 2
         elif i + 2 <= len(char_class) - 1 and char_class[i + 1] == '-':
             #rango de caracteres  
@@ -193,17 +240,17 @@ def _expand_char_class(char_class: str) -> str:
             if ord(start_char) > ord(end_char):
                 raise RegexValidationError(f"Rango invalido: {start_char}-{end_char}")
             
-            for code in range(ord(start_char), ord(end_char) + 1):
-                chars.add(chr(code))
+            mask |= _range_mask(ord(start_char), ord(end_char))
             i += 3
         else:
-            chars.add(char_class[i])
+            mask |= 1 << ord(char_class[i])
             i += 1
     
-    if not chars:
+    if not mask:
         raise RegexValidationError("Clase de caracteres vacia despues de expansion")
     
-    return '|'.join(sorted(chars))
+    #los intervalos salen ordenados: es la alternancia de los caracteres ordenados
+    return '|'.join(chr(code) for lo, hi in _mask_intervals(mask) for code in range(lo, hi + 1))
 
 
 def expand_quantifiers(regex: str) -> str:
@@ -217,28 +264,50 @@ def expand_quantifiers(regex: str) -> str:
         Regex expandida sin cuantificadores de repeticion
     """
     result = []
+    #pila de '(' abiertos y, por cada ')' de result, el indice de su '(' (0 si
+    #no tiene): el cuantificador toma el grupo sin buscar hacia atras
+    open_positions: List[int] = []
+    group_starts: Dict[int, int] = {}
     i = 0
     
     while i < len(regex):
         if regex[i] == '\\' and i + 1 < len(regex):
             result.append(regex[i:i+2])
             i += 2
+        elif regex[i] == '(':
+            open_positions.append(len(result))
+            result.append('(')
+            i += 1
+        elif regex[i] == ')':
+            #un ')' sin '(' toma todo lo anterior, como el grupo mas externo
+            group_starts[len(result)] = open_positions.pop() if open_positions else 0
+            result.append(')')
+            i += 1
         elif regex[i] == '{':
             #encontrar el elemento anterior
             if not result:
                 raise RegexValidationError("Cuantificador sin elemento previo")
             
-            #encontrar el cierre de la llave
-            j = i + 1
-            while j < len(regex) and regex[j] != '}':
-                j += 1
-            
-            if j >= len(regex):
+            #encontrar el cierre de la llave (no hay '}' escapado dentro)
+            j = regex.find('}', i + 1)
+            if j < 0:
                 raise RegexValidationError("Cuantificador sin cerrar")
             
+            #el ultimo elemento: el grupo que cierra result[-1] o la ultima entrada;
+            #tras un {0} el atomo anterior sigue registrado en group_starts
+            last = len(result) - 1
+            atom_start = group_starts[last] if result[-1] == ')' else last
             quantifier = regex[i+1:j]
-            expanded = _expand_quantifier(result, quantifier)
-            result = expanded
+            _expand_quantifier(result, quantifier, atom_start)
+            #los '(' del elemento ya no estan; las repeticiones de un '(' o ')'
+            #suelto se emparejan como si vinieran de la regex
+            while open_positions and open_positions[-1] >= atom_start:
+                open_positions.pop()
+            for k in range(atom_start, len(result)):
+                if result[k] == '(':
+                    open_positions.append(k)
+                elif result[k] == ')':
+                    group_starts[k] = open_positions.pop() if open_positions else 0
             i = j + 1
         else:
             result.append(regex[i])
@@ -247,8 +316,13 @@ def expand_quantifiers(regex: str) -> str:
     return ''.join(result)
 
 
-def _expand_quantifier(preceding: List[str], quantifier: str) -> List[str]:
-    """Expande un cuantificador especifico"""
+def _expand_quantifier(preceding: List[str], quantifier: str, atom_start: int) -> List[str]:
+    """Expande un cuantificador especifico.
+
+    Modifica preceding en el lugar (recorta el elemento preceding[atom_start:]
+    y agrega sus repeticiones) y lo devuelve, sin copiar el prefijo en cada
+    cuantificador.
+    """
     if ',' in quantifier:
         #{n,m} formato
         parts = quantifier.split(',')
@@ -273,36 +347,17 @@ def _expand_quantifier(preceding: List[str], quantifier: str) -> List[str]:
     if max_rep > 20:  #limite para evitar explosion exponencial
         raise RegexValidationError("Cuantificador demasiado grande (maximo 20)")
     
-    #tomar el ultimo elemento o grupo
-    if preceding and preceding[-1] == ')':
-        #buscar el grupo completo
-        paren_count = 1
-        start = len(preceding) - 2
-        while start >= 0 and paren_count > 0:
-            if preceding[start] == ')':
-                paren_count += 1
-            elif preceding[start] == '(':
-                paren_count -= 1
-            start -= 1
-        start += 1
-        element = ''.join(preceding[start:])
-        result = preceding[:start]
-    else:
-        #tomar el ultimo caracter
-        element = preceding[-1] if preceding else ''
-        result = preceding[:-1] if preceding else []
+    #el ultimo elemento o grupo ya viene delimitado por atom_start
+    element = ''.join(preceding[atom_start:])
+    del preceding[atom_start:]
+    result = preceding
     
     #expandir el cuantificador
-    if min_rep == max_rep:
-        #repeticion exacta
-        for _ in range(min_rep):
-            result.append(element)
-    else:
+    #el mismo objeto str se repite: no se copia el elemento por repeticion
+    result.extend([element] * min_rep)
+    if max_rep > min_rep:
         #rango de repeticiones - usar ? para hacer opcionales
-        for i in range(min_rep):
-            result.append(element)
-        for i in range(max_rep - min_rep):
-            result.append(f"({element})?")
+        result.extend([f"({element})?"] * (max_rep - min_rep))
     
     return result
 
@@ -317,40 +372,26 @@ def process_special_chars(regex: str) -> str:
     Returns:
         Regex procesada
     """
-    result = []
-    i = 0
-    
-    while i < len(regex):
-        if regex[i] == '\\' and i + 1 < len(regex):
-            next_char = regex[i + 1]
-            if next_char == 'n':
-                result.append('\n')
-            elif next_char == 't':
-                result.append('\t')
-            elif next_char == 'r':
-                result.append('\r')
-            elif next_char == '\\':
-                result.append('\\')
-            elif next_char in SPECIAL_CHARS:
-                result.append(next_char)
-            else:
-                result.append(next_char)
-            i += 2
-        elif regex[i] == '.':
-            #punto = cualquier caracter (simplificado a letras y digitos)
-            any_char = '|'.join(string.ascii_letters + string.digits)
-            result.append(f"({any_char})")
-            i += 1
-        else:
-            result.append(regex[i])
-            i += 1
-    
-    return ''.join(result)
+    #re recorre la cadena en C: solo escapes y puntos llegan a Python
+    return _SPECIAL_RE.sub(_replace_special, regex)
+
+
+def _replace_special(match: "re.Match[str]") -> str:
+    """Callback de process_special_chars"""
+    next_char = match.group(1)
+    if next_char is None:
+        return _ANY_CHAR_EXPANSION
+    #\n, \t y \r son control; cualquier otro escape es el caracter literal
+    return _ESCAPE_CONTROL.get(next_char, next_char)
 
 
+@lru_cache(maxsize=512)
 def to_postfix(regex: str) -> str:
     """
     Convierte una expresión regular a notación postfix.
+
+    La conversión es pura, así que los resultados se memorizan por regex
+    (to_postfix.cache_clear() los descarta); los errores no se guardan.
     
     Operadores soportados:
     - | (alternancia)
@@ -389,62 +430,57 @@ def to_postfix(regex: str) -> str:
         regex = process_special_chars(regex)
         
         #paso 5: verificar caracteres validos despues del procesamiento
-        for char in regex:
-            if not (char.isalnum() or char in "|*+?()εe \n\t\r\\."):
-                raise RegexValidationError(f"Caracter no valido: '{char}'")
+        _check_allowed_chars(regex)
         
         #paso 6: tokenizar
-        regex = regex.replace(" ", "")
-        tokens: List[str] = []
-        i = 0
-        while i < len(regex):
-            c = regex[i]
-            tokens.append(c)
-            i += 1
+        tokens = list(regex.replace(" ", ""))
+        
+        #clase y banderas de cada token (no ascii como ε es operando, sin banderas)
+        flags = [_CLASS_LUT[ord(t)] if ord(t) < 128 else CLS_OPERAND for t in tokens]
             
         #paso 7: insertar operadores de concatenacion explicitos
+        #se concatena salvo despues de | o ( y salvo antes de |, ) o unario
         augmented: List[str] = []
+        augmented_classes: List[int] = []
+        last = len(tokens) - 1
         for idx, t in enumerate(tokens):
             augmented.append(t)
-            if idx < len(tokens) - 1:
-                a, b = t, tokens[idx + 1]
-                if ((a not in {"|", "(", ")", "*", "+", "?"} and b not in {"|", ")", "*", "+", "?"}) or
-                    (a in {"*", "+", "?", ")"} and b not in {"|", ")", "*", "+", "?"})):
-                    augmented.append(".")
+            augmented_classes.append(flags[idx] & CLS_MASK)
+            if idx < last and not (flags[idx] & CAT_NO_CONCAT_AFTER or flags[idx + 1] & CAT_NO_CONCAT_BEFORE):
+                augmented.append(".")
+                augmented_classes.append(CLS_CONCAT)
         
         #paso 8: algoritmo shunting yard
+        #la pila solo guarda operadores ascii: bytearray de codigos, sin ord() al consultar
         output: List[str] = []
-        stack: List[str] = []
+        stack = bytearray()
         
-        for t in augmented:
-            if t == "(":
-                stack.append(t)
-            elif t == ")":
-                while stack and stack[-1] != "(":
-                    output.append(stack.pop())
+        for t, cls in zip(augmented, augmented_classes):
+            if cls == CLS_OPERAND:
+                #simbolo (incluyendo ε)
+                output.append(t)
+            elif cls == CLS_OPEN:
+                stack.append(_OPEN_CODE)
+            elif cls == CLS_CLOSE:
+                while stack and stack[-1] != _OPEN_CODE:
+                    output.append(_OP_CHARS[stack.pop()])
                 if not stack:
                     raise RegexValidationError("Parentesis desbalanceados: ')' sin '(' correspondiente")
                 stack.pop()
-            elif t in PRECEDENCE:
-                while stack and stack[-1] != "(" and (
-                    PRECEDENCE[stack[-1]] > PRECEDENCE[t] or (
-                        PRECEDENCE[stack[-1]] == PRECEDENCE[t] and t not in RIGHT_ASSOC
-                    )
-                ):
-                    output.append(stack.pop())
-                stack.append(t)
             else:
-                #simbolo (incluyendo ε)
-                if t in EPSILON_SYMBOLS:
-                    output.append("ε")
-                else:
-                    output.append(t)
+                code = ord(t)
+                entry = _CLASS_LUT[code]
+                prec = entry & PREC_BITS
+                #con igual precedencia solo se desapila si t asocia a la izquierda
+                bound = prec if entry & CAT_RIGHT_ASSOC else prec - (1 << PREC_SHIFT)
+                #'(' tiene precedencia 0 y bound >= 0: el bucle se detiene en el
+                while stack and (_CLASS_LUT[stack[-1]] & PREC_BITS) > bound:
+                    output.append(_OP_CHARS[stack.pop()])
+                stack.append(code)
         
-        while stack:
-            op = stack.pop()
-            if op in {"(", ")"}:
-                raise RegexValidationError("Parentesis desbalanceados: '(' sin ')' correspondiente")
-            output.append(op)
+        if _OPEN_CODE in stack:
+            raise RegexValidationError("Parentesis desbalanceados: '(' sin ')' correspondiente")
+        output.extend(_OP_CHARS[code] for code in reversed(stack))
         
         result = "".join(output)
         if not result:
@@ -1,46 +1,77 @@
 from __future__ import annotations
+import sys
 from dataclasses import dataclass
-from typing import List, Tuple
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Sequence, Set, Tuple
 from .automaton import Automaton, EPSILON
 
+#destinos vacíos compartidos en la representación entera (solo lectura)
+_NO_DESTS: Tuple[int, ...] = ()
+
+
 @dataclass
 class Fragment:
-    start: str
-    accepts: List[str]
+    start: int
+    accept: int  #Thompson: un solo estado de aceptación por fragmento
+    first_id: int  #los estados del fragmento son first_id.. (contiguos)
+    pos: int  #inicio del fragmento en el postfix
+    is_epsilon: bool = False
+    is_star: bool = False
+    is_symbols: bool = False  #solo aristas con símbolo de start a accept
+
 
+#los estados se numeran con enteros durante la construcción; cada uno guarda
+#sus aristas salientes (símbolo, destino) y el nombre "sN" solo se crea al final
+def _new_state(edges: List[List[Tuple[str, int]]]) -> int:
+    edges.append([])
+    return len(edges) - 1
 
-def _new_state(counter: List[int]) -> str:
-    s = f"s{counter[0]}"
-    counter[0] += 1
-    return s
+
+def state_name(i: int) -> str:
+    """Nombre del estado i del AFN de Thompson"""
+    return f"s{i}"
 
 
 def postfix_to_nfa(postfix: str) -> Automaton:
     """Construye un AFN usando Thompson a partir de una regex en postfix.
     Operadores: | alternancia, . concatenación, * estrella, + uno o más.
     Símbolo ε permitido en entrada postfix.
+    Los fragmentos triviales no se envuelven de nuevo: ε*, (r*)*, ε.r, r.ε y
+    r|r reutilizan el fragmento existente, y una alternancia de símbolos
+    (clases [..] y el punto) queda como un par de estados con una arista por
+    símbolo, sin ramas ε.
+
+    La construcción se memoriza por postfix (_nfa_blueprint) y cada llamada
+    devuelve una copia independiente, que el llamador puede modificar.
     """
+    return _nfa_blueprint(postfix).clone()
+
+
+@lru_cache(maxsize=512)
+def _nfa_blueprint(postfix: str) -> Automaton:
+    """AFN de Thompson compartido por todas las llamadas con el mismo postfix; no debe modificarse"""
     stack: List[Fragment] = []
-    counter = [0]
-    nfa = Automaton()
+    edges: List[List[Tuple[str, int]]] = []
+    #estados de fragmentos descartados por las simplificaciones
+    dropped: Set[int] = set()
 
-    for ch in postfix:
+    for i, ch in enumerate(postfix):
+        if ch in "*+?" and stack and (stack[-1].is_epsilon or stack[-1].is_star):
+            #ε* = ε+ = ε? = ε y (r*)* = (r*)+ = (r*)? = r*: se reutiliza tal cual
+            continue
         if ch == '*':
             if not stack:
                 raise ValueError("Error en postfix: operador * sin operando")
             frag = stack.pop()
-            start = _new_state(counter)
-            end = _new_state(counter)
-            nfa.add_state(start, initial=False)
-            nfa.add_state(end)
+            start = _new_state(edges)
+            end = _new_state(edges)
             # epsilon a antiguo inicio y al nuevo fin
-            nfa.add_transition(start, EPSILON, frag.start)
-            nfa.add_transition(start, EPSILON, end)
-            # de aceptaciones antiguas epsilon al inicio y al nuevo fin
-            for a in frag.accepts:
-                nfa.add_transition(a, EPSILON, frag.start)
-                nfa.add_transition(a, EPSILON, end)
-            stack.append(Fragment(start, [end]))
+            edges[start].append((EPSILON, frag.start))
+            edges[start].append((EPSILON, end))
+            # de la aceptación antigua epsilon al inicio y al nuevo fin
+            edges[frag.accept].append((EPSILON, frag.start))
+            edges[frag.accept].append((EPSILON, end))
+            stack.append(Fragment(start, end, frag.first_id, frag.pos, is_star=True))
         elif ch == '+':
             if not stack:
                 raise ValueError("Error en postfix: operador + sin operando")
@@ -50,80 +81,127 @@ def postfix_to_nfa(postfix: str) -> Automaton:
             # Reutilizamos construyendo A seguido de A*
             # Implementación directa: A+ = A concatenado con A*
             # Para eficiencia: similar a estrella pero sin epsilon directo al nuevo fin
-            start = _new_state(counter)
-            end = _new_state(counter)
-            nfa.add_state(start)
-            nfa.add_state(end)
-            nfa.add_transition(start, EPSILON, frag.start)
-            for a in frag.accepts:
-                # bucle
-                nfa.add_transition(a, EPSILON, frag.start)
-                nfa.add_transition(a, EPSILON, end)
-            stack.append(Fragment(start, [end]))
+            start = _new_state(edges)
+            end = _new_state(edges)
+            edges[start].append((EPSILON, frag.start))
+            # bucle
+            edges[frag.accept].append((EPSILON, frag.start))
+            edges[frag.accept].append((EPSILON, end))
+            stack.append(Fragment(start, end, frag.first_id, frag.pos))
         elif ch == '?':
             if not stack:
                 raise ValueError("Error en postfix: operador ? sin operando")
             frag = stack.pop()
-            start = _new_state(counter)
-            end = _new_state(counter)
-            nfa.add_state(start)
-            nfa.add_state(end)
+            start = _new_state(edges)
+            end = _new_state(edges)
             
             # Epsilon directo al final (omitir)
-            nfa.add_transition(start, EPSILON, end)
+            edges[start].append((EPSILON, end))
             # Epsilon al inicio del fragmento (ejecutar)
-            nfa.add_transition(start, EPSILON, frag.start)
-            # De las aceptaciones al final
-            for a in frag.accepts:
-                nfa.add_transition(a, EPSILON, end)
+            edges[start].append((EPSILON, frag.start))
+            # De la aceptación al final
+            edges[frag.accept].append((EPSILON, end))
             
-            stack.append(Fragment(start, [end]))
+            stack.append(Fragment(start, end, frag.first_id, frag.pos))
         elif ch == '.':
             if len(stack) < 2:
                 raise ValueError("Error en postfix: operador . requiere dos operandos")
             frag2 = stack.pop()
             frag1 = stack.pop()
-            # conectar aceptaciones de frag1 con inicio de frag2
-            for a in frag1.accepts:
-                nfa.add_transition(a, EPSILON, frag2.start)
-            stack.append(Fragment(frag1.start, frag2.accepts))
+            if frag1.is_epsilon or frag2.is_epsilon:
+                #ε.r = r.ε = r: se descartan los dos estados del ε
+                empty, kept = (frag1, frag2) if frag1.is_epsilon else (frag2, frag1)
+                dropped.add(empty.start)
+                dropped.add(empty.accept)
+                stack.append(Fragment(kept.start, kept.accept, frag1.first_id, frag1.pos,
+                                      kept.is_epsilon, kept.is_star, kept.is_symbols))
+                continue
+            # conectar la aceptación de frag1 con el inicio de frag2
+            edges[frag1.accept].append((EPSILON, frag2.start))
+            stack.append(Fragment(frag1.start, frag2.accept, frag1.first_id, frag1.pos))
         elif ch == '|':
             if len(stack) < 2:
                 raise ValueError("Error en postfix: operador | requiere dos operandos")
             frag2 = stack.pop()
             frag1 = stack.pop()
-            start = _new_state(counter)
-            end = _new_state(counter)
-            nfa.add_state(start)
-            nfa.add_state(end)
-            nfa.add_transition(start, EPSILON, frag1.start)
-            nfa.add_transition(start, EPSILON, frag2.start)
-            for a in frag1.accepts:
-                nfa.add_transition(a, EPSILON, end)
-            for a in frag2.accepts:
-                nfa.add_transition(a, EPSILON, end)
-            stack.append(Fragment(start, [end]))
+            if frag2.pos - frag1.pos == i - frag2.pos and postfix[frag1.pos:frag2.pos] == postfix[frag2.pos:i]:
+                #r|r = r: mismo postfix, mismo fragmento; los estados de frag2
+                #son los últimos creados
+                dropped.update(range(frag2.first_id, len(edges)))
+                stack.append(frag1)
+                continue
+            if frag1.is_symbols and frag2.is_symbols:
+                #a|b|c...: las aristas de frag2 pasan al par de estados de frag1
+                #(los estados de frag2 son los últimos creados)
+                out = edges[frag1.start]
+                for sym, _ in edges[frag2.start]:
+                    if (sym, frag1.accept) not in out:
+                        out.append((sym, frag1.accept))
+                dropped.update(range(frag2.first_id, len(edges)))
+                stack.append(frag1)
+                continue
+            start = _new_state(edges)
+            end = _new_state(edges)
+            edges[start].append((EPSILON, frag1.start))
+            edges[start].append((EPSILON, frag2.start))
+            edges[frag1.accept].append((EPSILON, end))
+            edges[frag2.accept].append((EPSILON, end))
+            stack.append(Fragment(start, end, frag1.first_id, frag1.pos))
         else:
             # símbolo literal (incluye ε)
-            start = _new_state(counter)
-            end = _new_state(counter)
-            nfa.add_state(start)
-            nfa.add_state(end)
+            start = _new_state(edges)
+            end = _new_state(edges)
             if ch == EPSILON:
-                nfa.add_transition(start, EPSILON, end)
+                edges[start].append((EPSILON, end))
             else:
-                nfa.add_transition(start, ch, end)
-            stack.append(Fragment(start, [end]))
+                edges[start].append((ch, end))
+            stack.append(Fragment(start, end, start, i, is_epsilon=ch == EPSILON, is_symbols=ch != EPSILON))
 
     if len(stack) != 1:
         raise ValueError("Regex postfix no valido (pila final != 1)")
 
     frag = stack.pop()
-    # Ajustar estados inicial y de aceptación
-    nfa.initial = frag.start
-    for a in frag.accepts:
-        nfa.accepts.add(a)
-    # Añadir estados faltantes (los que pudieron crearse sin registrar) -> ya se registraron al add_state
+    #materializar el autómata de una vez: nombres y destinos agrupados por símbolo
+    #y, con la misma numeración entera, la representación que usa determinize
+    names = [sys.intern(state_name(i)) for i in range(len(edges))]
+    live = [q for q in range(len(edges)) if q not in dropped] if dropped else range(len(edges))
+    dense = [0] * len(edges)
+    for i, q in enumerate(live):
+        dense[q] = i
+    alphabet = {sym for q in live for sym, _ in edges[q] if sym != EPSILON}
+    symbols = sorted(alphabet)
+    sym_index = {sym: j for j, sym in enumerate(symbols)}
+    transitions: Dict[str, Dict[str, FrozenSet[str]]] = {}
+    trans: List[List[Sequence[int]]] = []
+    eps_succ: List[Sequence[int]] = []
+    for q in live:
+        grouped: Dict[str, List[int]] = {}
+        for sym, d in edges[q]:
+            dests = grouped.get(sym)
+            if dests is None:
+                grouped[sym] = [d]
+            else:
+                dests.append(d)
+        transitions[names[q]] = {sym: frozenset([names[d] for d in dests]) for sym, dests in grouped.items()}
+        #la mayoría de los estados tiene una sola arista: el resto comparte la tupla vacía
+        row: List[Sequence[int]] = [_NO_DESTS] * len(symbols)
+        eps: Sequence[int] = _NO_DESTS
+        for sym, dests in grouped.items():
+            ids = [dense[d] for d in dests]
+            if sym == EPSILON:
+                eps = ids
+            else:
+                row[sym_index[sym]] = ids
+        trans.append(row)
+        eps_succ.append(eps)
+    nfa = Automaton(
+        states={names[q] for q in live},
+        alphabet=alphabet,
+        transitions=transitions,
+        initial=names[frag.start],
+        accepts={names[frag.accept]},
+    )
+    nfa._seed_compact([names[q] for q in live], symbols, trans, eps_succ)
     return nfa
 
-__all__ = ["postfix_to_nfa"]
+__all__ = ["postfix_to_nfa", "state_name"]
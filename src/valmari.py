@@ -0,0 +1,198 @@
+from __future__ import annotations
+from typing import Dict, List
+from .automaton import Automaton, EPSILON
+
+#minimización de Valmari-Lehtinen (Valmari 2012, algoritmo 4) para DFA parciales.
+#refina a la vez una partición de estados (bloques) y una de transiciones (cuerdas),
+#ambas guardadas en arreglos planos de enteros: O(m log n) con m = transiciones vivas.
+
+
+class _Partition:
+    """Partición refinable sobre 0..n-1 en arreglos planos.
+
+    - elems: elementos agrupados por conjunto
+    - loc: posición de cada elemento dentro de elems
+    - sidx: conjunto al que pertenece cada elemento
+    - first/past: rango [first, past) de cada conjunto dentro de elems
+    """
+
+    def __init__(self, n: int) -> None:
+        self.z = 1 if n else 0
+        self.elems = list(range(n))
+        self.loc = list(range(n))
+        self.sidx = [0] * n
+        self.first = [0] * (n + 1)
+        self.past = [0] * (n + 1)
+        if n:
+            self.past[0] = n
+
+    def mark(self, e: int, marked: List[int], touched: List[int]) -> None:
+        s = self.sidx[e]
+        i = self.loc[e]
+        j = self.first[s] + marked[s]
+        self.elems[i] = self.elems[j]
+        self.loc[self.elems[i]] = i
+        self.elems[j] = e
+        self.loc[e] = j
+        if not marked[s]:
+            touched.append(s)
+        marked[s] += 1
+
+    def split(self, marked: List[int], touched: List[int]) -> None:
+        while touched:
+            s = touched.pop()
+            j = self.first[s] + marked[s]
+            if j == self.past[s]:
+                marked[s] = 0
+                continue
+            z = self.z
+            #la parte más pequeña se convierte en el conjunto nuevo
+            if marked[s] <= self.past[s] - j:
+                self.first[z] = self.first[s]
+                self.past[z] = self.first[s] = j
+            else:
+                self.past[z] = self.past[s]
+                self.first[z] = self.past[s] = j
+            for i in range(self.first[z], self.past[z]):
+                self.sidx[self.elems[i]] = z
+            marked[s] = marked[z] = 0
+            self.z += 1
+
+
+def minimize_valmari(dfa: Automaton, assume_reachable: bool = False) -> Automaton:
+    """Minimiza un DFA (posiblemente parcial) con el algoritmo de Valmari-Lehtinen.
+
+    Se eliminan los estados inalcanzables. Si hay estados sin camino a aceptación
+    (como el estado de absorción), antes de refinar las transiciones faltantes se
+    dirigen a uno de ellos: así todos caen en un mismo bloque y el resultado es el
+    DFA completo mínimo, como el de minimize_hopcroft. Sin estados muertos el
+    resultado es el DFA parcial mínimo. Los nombres siguen la misma convención: un bloque de un solo estado conserva
+    su nombre y los bloques fusionados se llaman "mX". Con assume_reachable=True
+    se omite remove_unreachable.
+    """
+    if not dfa.is_deterministic():
+        raise ValueError("minimize_valmari requiere un DFA determinista")
+    if dfa.initial is None:
+        raise ValueError("DFA sin estado inicial")
+
+    if not assume_reachable:
+        dfa.remove_unreachable()
+
+    #estados numerados con las aceptaciones al principio
+    names = sorted(s for s in dfa.states if s in dfa.accepts) + sorted(s for s in dfa.states if s not in dfa.accepts)
+    n_final = len(dfa.accepts & dfa.states)
+    sid: Dict[str, int] = {s: i for i, s in enumerate(names)}
+    n = len(names)
+
+    #transiciones como tres arreglos paralelos: cola, etiqueta, cabeza
+    tails: List[int] = []
+    labels: List[str] = []
+    heads: List[int] = []
+    for src in names:
+        for sym, dests in dfa.transitions.get(src, {}).items():
+            if sym == EPSILON or len(dests) != 1:
+                continue
+            tails.append(sid[src])
+            labels.append(sym)
+            heads.append(sid[next(iter(dests))])
+    m = len(tails)
+
+    #estados con camino a aceptación: búsqueda hacia atrás desde las aceptaciones
+    preds: List[List[int]] = [[] for _ in range(n)]
+    for t in range(m):
+        preds[heads[t]].append(tails[t])
+    live = [q < n_final for q in range(n)]
+    stack = list(range(n_final))
+    while stack:
+        for p in preds[stack.pop()]:
+            if not live[p]:
+                live[p] = True
+                stack.append(p)
+
+    #una transición faltante equivale a ir a un estado muerto; si no se completa,
+    #un destino muerto explícito y una transición faltante quedarían distinguidos
+    if not all(live):
+        dead = live.index(False)
+        present = set(zip(tails, labels))
+        for sym in sorted(set(labels)):
+            for q in range(n):
+                if (q, sym) not in present:
+                    tails.append(q)
+                    labels.append(sym)
+                    heads.append(dead)
+        m = len(tails)
+
+    marked = [0] * (max(n, m) + 1)
+    touched: List[int] = []
+
+    #partición inicial de estados: aceptación / no aceptación
+    blocks = _Partition(n)
+    if 0 < n_final < n:
+        marked[0] = n_final
+        touched.append(0)
+        blocks.split(marked, touched)
+
+    #partición inicial de transiciones: por etiqueta
+    cords = _Partition(m)
+    if m:
+        cords.elems.sort(key=lambda t: labels[t])
+        cords.z = 0
+        label = labels[cords.elems[0]]
+        for i, t in enumerate(cords.elems):
+            if labels[t] != label:
+                label = labels[t]
+                cords.past[cords.z] = i
+                cords.z += 1
+                cords.first[cords.z] = i
+            cords.sidx[t] = cords.z
+            cords.loc[t] = i
+        cords.past[cords.z] = m
+        cords.z += 1
+
+    #transiciones entrantes por estado (adyacencia tipo CSR sobre las cabezas)
+    in_start = [0] * (n + 1)
+    for h in heads:
+        in_start[h + 1] += 1
+    for q in range(n):
+        in_start[q + 1] += in_start[q]
+    in_trans = [0] * m
+    fill = in_start[:-1]
+    for t, h in enumerate(heads):
+        in_trans[fill[h]] = t
+        fill[h] += 1
+
+    #refinar bloques con cuerdas y cuerdas con bloques hasta estabilizar
+    b, c = 1, 0
+    while c < cords.z:
+        for i in range(cords.first[c], cords.past[c]):
+            blocks.mark(tails[cords.elems[i]], marked, touched)
+        blocks.split(marked, touched)
+        c += 1
+        while b < blocks.z:
+            for i in range(blocks.first[b], blocks.past[b]):
+                q = blocks.elems[i]
+                for j in range(in_start[q], in_start[q + 1]):
+                    cords.mark(in_trans[j], marked, touched)
+            cords.split(marked, touched)
+            b += 1
+
+    #construcción del DFA mínimo
+    block_name: List[str] = []
+    mcount = 0
+    for k in range(blocks.z):
+        if blocks.past[k] - blocks.first[k] == 1:
+            block_name.append(names[blocks.elems[blocks.first[k]]])
+        else:
+            block_name.append(f"m{mcount}")
+            mcount += 1
+
+    min_dfa = Automaton()
+    initial_block = blocks.sidx[sid[dfa.initial]]
+    for k in range(blocks.z):
+        rep = blocks.elems[blocks.first[k]]
+        min_dfa.add_state(block_name[k], accept=rep < n_final, initial=(k == initial_block))
+    for t in range(m):
+        min_dfa.add_transition(block_name[blocks.sidx[tails[t]]], labels[t], block_name[blocks.sidx[heads[t]]])
+    return min_dfa
+
+__all__ = ["minimize_valmari"]
@@ -9,19 +9,41 @@ Casos de prueba
 import unittest
 import tempfile
 import os
+import shutil
+from functools import lru_cache
+from itertools import product
 from pathlib import Path
 import time
-from typing import List, Tuple
+from typing import Tuple
 
 from src.parser import to_postfix, validate_regex, RegexValidationError
 from src.thompson import postfix_to_nfa
 from src.hopcroft import minimize_hopcroft
+from src.valmari import minimize_valmari
+from src.codegen import codegen_simulator
 from src.exporter import (
-    export_json, export_dot, export_image, 
+    export_json, export_dot, export_image, export_all,
     export_interactive_html, export_step_by_step_simulation
 )
 from src.automaton import Automaton, EPSILON
 
+#graphviz se busca una sola vez; sin dot la prueba de imagen se omite
+_HAS_DOT = shutil.which("dot") is not None
+
+
+@lru_cache(maxsize=None)
+def _build(regex: str) -> Tuple[str, Automaton, Automaton, Automaton]:
+    """Pipeline completo de una regex, construido una sola vez por proceso.
+
+    Returns:
+        (postfix, AFN, AFD, AFD mínimo); los autómatas se comparten entre
+        pruebas y no deben modificarse
+    """
+    postfix = to_postfix(regex)
+    nfa = postfix_to_nfa(postfix)
+    dfa = nfa.determinize()
+    return postfix, nfa, dfa, minimize_hopcroft(dfa)
+
 
 class TestRegexParser(unittest.TestCase):
     """Pruebas para el parser de regex"""
@@ -74,12 +96,20 @@ class TestRegexParser(unittest.TestCase):
                 #verificar que no hay errores
                 self.assertIsInstance(result, str)
                 self.assertGreater(len(result), 0)
-    
+                #la clase se expande a la misma alternancia escrita a mano
+                self.assertEqual(result, to_postfix(expected_expansion))
+                nfa = postfix_to_nfa(result)
+                for char in expected_expansion.strip("()").split("|"):
+                    self.assertTrue(nfa.simulate_nfa(char))
+                self.assertFalse(nfa.simulate_nfa("d"))
+
     def test_quantifiers(self):
         """Pruebas para cuantificadores"""
         test_cases = [
             ("a{2}", "aa."),
-            ("a{1,2}", "a(a)?.")
+            ("a{1,2}", "a(a)?."),
+            ("a{0}b", "b"),
+            ("(ab){0}c", "c"),
         ]
         
         for regex, expected_pattern in test_cases:
@@ -88,6 +118,18 @@ class TestRegexParser(unittest.TestCase):
                 #verificar que la expansión es válida
                 self.assertIsInstance(result, str)
                 self.assertGreater(len(result), 0)
+        
+        #{0} elimina el elemento por completo; el siguiente cuantificador toma
+        #el elemento anterior, no todo el prefijo
+        expansions = [
+            ("a{0}b", "b"),
+            ("(ab){0}c", "c"),
+            ("x(y)z{0}{3}", "x(y)(y)(y)"),
+            ("(a)0(b)c{0}{2}", "(a)0(b)(b)"),
+        ]
+        for regex, expected in expansions:
+            with self.subTest(regex=regex):
+                self.assertEqual(to_postfix(regex), to_postfix(expected))
     
     def test_special_characters(self):
         """Pruebas para caracteres especiales"""
@@ -186,8 +228,15 @@ class TestThompsonConstruction(unittest.TestCase):
         self.assertTrue(len(nfa_opt.states) >= 2)
         
         #alternancia
-        nfa_alt = postfix_to_nfa("ab|")
+        nfa_alt = postfix_to_nfa("ab.c|")
         self.assertTrue(len(nfa_alt.states) >= 4)
+        
+        #alternancia de símbolos (clases y punto): un par de estados, sin ramas ε
+        nfa_symbols = postfix_to_nfa("ab|c|")
+        self.assertEqual(len(nfa_symbols.states), 2)
+        self.assertFalse(nfa_symbols.simulate_nfa(""))
+        for char in "abc":
+            self.assertTrue(nfa_symbols.simulate_nfa(char))
     
     def test_invalid_postfix(self):
         """Pruebas para postfix inválidos"""
@@ -206,6 +255,38 @@ class TestThompsonConstruction(unittest.TestCase):
                 with self.assertRaises(ValueError):
                     postfix_to_nfa(invalid_postfix)
 
+    def test_nfa_cache_returns_copies(self):
+        """Modificar un AFN devuelto no afecta a las siguientes construcciones"""
+        first = postfix_to_nfa("ab.")
+        first.add_state("extra", accept=True)
+        second = postfix_to_nfa("ab.")
+        self.assertNotIn("extra", second.states)
+        self.assertEqual(len(second.states), 4)
+        #la representación entera compartida no sobrevive a la modificación
+        for accept in second.accepts:
+            first.add_transition(accept, "c", "extra")
+        self.assertTrue(first.simulate_nfa("abc"))
+        self.assertFalse(second.simulate_nfa("abc"))
+        self.assertTrue(second.simulate_nfa("ab"))
+
+    def test_trivial_fragments_simplified(self):
+        """ε, estrellas repetidas y alternativas iguales no agregan estados"""
+        equivalent = [
+            ("a**", "a*"),
+            ("a*+", "a*"),
+            ("a*?", "a*"),
+            ("εa.", "a"),
+            ("aε.", "a"),
+            ("aa|", "a"),
+            ("ab.ab.|", "ab."),
+        ]
+        for postfix, simple in equivalent:
+            with self.subTest(postfix=postfix):
+                nfa = postfix_to_nfa(postfix)
+                self.assertEqual(len(nfa.states), len(postfix_to_nfa(simple).states))
+                for string in ["", "a", "aa", "ab", "abab"]:
+                    self.assertEqual(nfa.simulate_nfa(string), postfix_to_nfa(simple).simulate_nfa(string))
+
 
 class TestAutomatonMethods(unittest.TestCase):
     """Pruebas para métodos del autómata"""
@@ -239,6 +320,15 @@ class TestAutomatonMethods(unittest.TestCase):
         self.assertIsNotNone(dfa.initial)
         self.assertGreater(len(dfa.accepts), 0)
     
+    def test_determinism_cache(self):
+        """El determinismo cacheado se actualiza al añadir estados y transiciones"""
+        self.assertTrue(self.nfa.is_dfa())
+        self.nfa.add_state("q3")
+        self.nfa.add_transition("q2", "a", "q3")
+        self.assertTrue(self.nfa.is_dfa())
+        self.nfa.add_transition("q0", "a", "q2")
+        self.assertFalse(self.nfa.is_dfa())
+
     def test_simulation(self):
         """Pruebas para simulación de cadenas"""
         dfa = self.nfa.determinize()
@@ -251,7 +341,49 @@ class TestAutomatonMethods(unittest.TestCase):
         #cadena rechazada
         path, accepted = dfa.simulate_dfa_path("a")
         self.assertFalse(accepted)
-    
+
+    def test_dense_table_simulation(self):
+        """La simulación con tabla densa coincide con simulate_dfa"""
+        dfa = minimize_hopcroft(postfix_to_nfa(to_postfix("(a|b)*abb")).determinize())
+
+        for string in ["", "abb", "ab" * 500 + "b", "abc", "c"]:
+            with self.subTest(string=string):
+                path, accepted = dfa.simulate_dfa_path(string)
+                self.assertEqual(accepted, dfa.simulate_dfa(string))
+                self.assertEqual(path[0], dfa.initial)
+                self.assertLessEqual(len(path), len(string) + 1)
+
+    def test_dead_state_early_exit(self):
+        """La simulación se detiene al entrar al estado de absorción"""
+        dfa = minimize_hopcroft(postfix_to_nfa(to_postfix("ab")).determinize())
+        dead = dfa.dead_state
+        self.assertIsNotNone(dead)
+        self.assertTrue(dfa.is_dead_state(dead))
+
+        path, accepted = dfa.simulate_dfa_path("ba" * 100)
+        self.assertFalse(accepted)
+        self.assertEqual(len(path), 201)
+        self.assertEqual(path[1:], [dead] * 200)
+
+        #un símbolo fuera del alfabeto corta el camino también en el estado de absorción
+        for simulate in (dfa.simulate_dfa_path, codegen_simulator(dfa)):
+            with self.subTest(simulate=simulate):
+                self.assertEqual(simulate("bbxb"), ([dfa.initial, dead, dead], False))
+
+    def test_codegen_simulator(self):
+        """El simulador generado coincide con simulate_dfa_path"""
+        dfa = _build("(a|b)*abb")[3]
+        #con pocas cadenas no se genera código: se usa la simulación directa
+        self.assertEqual(codegen_simulator(dfa, 1), dfa.simulate_dfa_path)
+        self.assertIsNone(dfa._simulator_cache)
+        run = codegen_simulator(dfa)
+        self.assertIs(codegen_simulator(dfa), run)
+        self.assertIs(codegen_simulator(dfa, 1), run)
+
+        for string in ["", "abb", "ab" * 500 + "b", "abc", "c"]:
+            with self.subTest(string=string):
+                self.assertEqual(run(string), dfa.simulate_dfa_path(string))
+
     def test_relabel_sequential(self):
         """Pruebas para etiquetado secuencial"""
         relabeled = self.nfa.relabel_sequential()
@@ -271,11 +403,7 @@ class TestHopcroftMinimization(unittest.TestCase):
     def test_basic_minimization(self):
         """Pruebas básicas de minimización"""
         #crear dfa simple
-        postfix = "ab."
-        nfa = postfix_to_nfa(postfix)
-        dfa = nfa.determinize()
-        
-        minimized = minimize_hopcroft(dfa)
+        _, _, dfa, minimized = _build("ab")
         
         #verificar que es dfa valido
         self.assertTrue(minimized.is_dfa())
@@ -287,43 +415,89 @@ class TestHopcroftMinimization(unittest.TestCase):
     def test_minimization_reduces_states(self):
         """Verificar que la minimización reduce estados redundantes"""
         #crear dfa con estados redundantes
-        postfix = "a*b."
-        nfa = postfix_to_nfa(postfix)
-        dfa = nfa.determinize()
-        
-        minimized = minimize_hopcroft(dfa)
+        _, _, dfa, minimized = _build("a*b")
         
         #debería reducir el n de estados
         self.assertLessEqual(len(minimized.states), len(dfa.states))
 
+    def test_partial_dfa(self):
+        """Un DFA parcial no fusiona estados que difieren en transiciones faltantes"""
+        dfa = Automaton()
+        dfa.add_state("s0", initial=True, accept=True)
+        dfa.add_state("s1", accept=True)
+        dfa.add_transition("s0", "b", "s1")
+        minimized = minimize_hopcroft(dfa)
+        self.assertEqual(len(minimized.states), 2)
+        for string, expected in [("", True), ("b", True), ("bb", False)]:
+            with self.subTest(string=string):
+                self.assertEqual(minimized.simulate_dfa(string), expected)
+
+    def test_valmari_matches_hopcroft(self):
+        """Valmari-Lehtinen produce el mismo número de estados que Hopcroft"""
+        for regex in ["(a|b)*abb", "a*b*c*", "(a+b+|c)*", "(a|b)*a(a|b)(a|b)(a|b)"]:
+            with self.subTest(regex=regex):
+                _, nfa, _, hopcroft = _build(regex)
+                valmari = minimize_valmari(nfa.determinize())
+
+                self.assertTrue(valmari.is_dfa())
+                self.assertEqual(len(valmari.states), len(hopcroft.states))
+                for string in ["", "a", "abb", "babb", "aabab", "abc", "cab"]:
+                    self.assertEqual(valmari.simulate_dfa_path(string)[1],
+                                     hopcroft.simulate_dfa_path(string)[1])
+
+    def test_valmari_partial_with_dead_state(self):
+        """Un DFA parcial con estado muerto explícito y transiciones faltantes queda mínimo"""
+        dfa = Automaton()
+        dfa.add_state("s0", initial=True)
+        dfa.add_state("s1", accept=True)
+        dfa.add_state("s2", accept=True)
+        dfa.add_state("d")
+        dfa.add_transition("s0", "a", "s1")
+        dfa.add_transition("s0", "b", "s2")
+        dfa.add_transition("s1", "a", "d")
+        dfa.add_transition("d", "a", "d")
+        dfa.add_transition("d", "b", "d")
+
+        #s1 (a hacia d) y s2 (sin transiciones) son equivalentes
+        minimized = minimize_valmari(dfa)
+        self.assertEqual(len(minimized.states), 3)
+        self.assertTrue(minimized.is_dfa())
+        for string, expected in [("", False), ("a", True), ("b", True), ("aa", False), ("ba", False)]:
+            with self.subTest(string=string):
+                self.assertEqual(minimized.simulate_dfa(string), expected)
+
 
 class TestExporter(unittest.TestCase):
     """Pruebas para exportación"""
     
-    def setUp(self):
-        """Configurar directorio temporal"""
-        self.temp_dir = tempfile.mkdtemp()
+    @classmethod
+    def setUpClass(cls):
+        """Configurar directorio temporal (uno para toda la clase)"""
+        cls._temp = tempfile.TemporaryDirectory()
+        cls.temp_dir = cls._temp.name
         
-        #crear autómata simple para pruebas
-        self.nfa = postfix_to_nfa("ab.")
-        self.dfa = self.nfa.determinize()
+        #crear autómata simple para pruebas (compartido: las exportaciones no lo modifican)
+        _, cls.nfa, cls.dfa, _ = _build("ab")
     
-    def tearDown(self):
+    @classmethod
+    def tearDownClass(cls):
         """Limpiar archivos temporales"""
-        import shutil
-        shutil.rmtree(self.temp_dir)
+        cls._temp.cleanup()
+    
+    def _path(self, ext: str) -> str:
+        """Archivo propio de la prueba actual dentro del directorio compartido"""
+        return os.path.join(self.temp_dir, f"{self._testMethodName}.{ext}")
     
     def test_json_export(self):
         """Pruebas para exportación JSON"""
-        json_path = os.path.join(self.temp_dir, "test.json")
+        json_path = self._path("json")
         export_json(self.dfa, json_path)
         
         self.assertTrue(os.path.exists(json_path))
         
-        #verificar contenido json
+        #verificar contenido json (json.loads acepta bytes utf-8 directamente)
         import json
-        with open(json_path) as f:
-            data = json.load(f)
+        data = json.loads(Path(json_path).read_bytes())
         
         self.assertIn("ESTADOS", data)
         self.assertIn("SIMBOLOS", data)
@@ -331,7 +505,7 @@ class TestExporter(unittest.TestCase):
     
     def test_dot_export(self):
         """Pruebas para exportación DOT"""
-        dot_path = os.path.join(self.temp_dir, "test.dot")
+        dot_path = self._path("dot")
         export_dot(self.dfa, dot_path)
         
         self.assertTrue(os.path.exists(dot_path))
@@ -343,20 +517,44 @@ class TestExporter(unittest.TestCase):
         self.assertIn("digraph", content)
         self.assertIn("->", content)
     
+    def test_export_all_skips_unchanged(self):
+        """Los archivos idénticos a la exportación anterior no se reescriben"""
+        base = os.path.join(self.temp_dir, self._testMethodName)
+        export_all([(self.dfa, base)], formats=("json", "dot"))
+        first = {ext: os.stat(f"{base}.{ext}").st_mtime_ns for ext in ("json", "dot")}
+        
+        #volver a exportar el mismo autómata no toca los archivos
+        time.sleep(0.01)
+        export_all([(self.dfa, base)], formats=("json", "dot"))
+        for ext, mtime in first.items():
+            with self.subTest(ext=ext):
+                self.assertEqual(os.stat(f"{base}.{ext}").st_mtime_ns, mtime)
+        
+        #un archivo editado a mano se compara con lo que hay en disco y se restaura
+        with open(f"{base}.dot", "w", encoding="utf-8") as f:
+            f.write("editado")
+        export_all([(self.dfa, base)], formats=("dot",))
+        with open(f"{base}.dot", encoding="utf-8") as f:
+            self.assertIn("digraph", f.read())
+        
+        #un autómata distinto sí se reescribe
+        export_all([(postfix_to_nfa("ab|").determinize(), base)], formats=("json",))
+        self.assertNotEqual(os.stat(f"{base}.json").st_mtime_ns, first["json"])
+        #no quedan archivos auxiliares junto a los exportados
+        self.assertFalse([name for name in os.listdir(self.temp_dir) if name.startswith(".")])
+    
+    @unittest.skipUnless(_HAS_DOT, "graphviz (dot) no está instalado")
     def test_image_export(self):
         """Pruebas para exportación de imágenes"""
-        png_path = os.path.join(self.temp_dir, "test.png")
+        png_path = self._path("png")
         
-        #intentar exportar (puede fallar si graphviz no está instalado)
-        success = export_image(self.dfa, png_path)
-        
-        #solo verificar si tuvo éxito
-        if success:
-            self.assertTrue(os.path.exists(png_path))
+        #con dot disponible la exportación debe funcionar
+        self.assertTrue(export_image(self.dfa, png_path))
+        self.assertTrue(os.path.exists(png_path))
     
     def test_html_export(self):
         """Pruebas para exportación HTML"""
-        html_path = os.path.join(self.temp_dir, "test.html")
+        html_path = self._path("html")
         
         success = export_interactive_html(self.dfa, html_path)
         
@@ -378,20 +576,18 @@ class TestIntegration(unittest.TestCase):
         """Prueba del pipeline completo: regex -> AFN -> AFD -> mínimo"""
         regex = "(a|b)*abb"
         
+        postfix, nfa, dfa, minimized = _build(regex)
+        
         #paso 1: parser
-        postfix = to_postfix(regex)
         self.assertIsInstance(postfix, str)
         
         #paso 2: afn
-        nfa = postfix_to_nfa(postfix)
         self.assertIsInstance(nfa, Automaton)
         
         #paso 3: afd
-        dfa = nfa.determinize()
         self.assertTrue(dfa.is_dfa())
         
         #paso 4: minimización
-        minimized = minimize_hopcroft(dfa)
         self.assertTrue(minimized.is_dfa())
         
         #verificar que acepta cadenas correctas
@@ -405,10 +601,10 @@ class TestIntegration(unittest.TestCase):
             ("", False),
         ]
         
-        for string, should_accept in test_strings:
-            with self.subTest(string=string):
-                path, accepted = minimized.simulate_dfa_path(string)
-                self.assertEqual(accepted, should_accept)
+        #todas las cadenas se comparan con una sola aserción
+        strings = [string for string, _ in test_strings]
+        self.assertEqual([minimized.simulate_dfa(string) for string in strings],
+                         [should_accept for _, should_accept in test_strings])
     
     def test_regex_equivalence(self):
         """Verificar que diferentes regex equivalentes producen autómatas equivalentes"""
@@ -420,26 +616,17 @@ class TestIntegration(unittest.TestCase):
         for regex1, regex2 in equivalent_pairs:
             with self.subTest(regex1=regex1, regex2=regex2):
                 #construir autómatas
-                postfix1 = to_postfix(regex1)
-                postfix2 = to_postfix(regex2)
-                
-                nfa1 = postfix_to_nfa(postfix1)
-                nfa2 = postfix_to_nfa(postfix2)
+                dfa1 = _build(regex1)[3]
+                dfa2 = _build(regex2)[3]
                 
-                dfa1 = minimize_hopcroft(nfa1.determinize())
-                dfa2 = minimize_hopcroft(nfa2.determinize())
-                
-                #probar con algunas cadenas
+                #probar con algunas cadenas; un símbolo fuera del alfabeto
+                #rechaza la cadena en ambos (sin excepción)
                 test_strings = ["", "a", "aa", "aaa", "b"]
                 
                 for test_str in test_strings:
-                    try:
-                        _, acc1 = dfa1.simulate_dfa_path(test_str)
-                        _, acc2 = dfa2.simulate_dfa_path(test_str)
-                        self.assertEqual(acc1, acc2, f"Diferencia en cadena '{test_str}'")
-                    except ValueError:
-                        #puede haber símbolos no en el alfabeto
-                        pass
+                    _, acc1 = dfa1.simulate_dfa_path(test_str)
+                    _, acc2 = dfa2.simulate_dfa_path(test_str)
+                    self.assertEqual(acc1, acc2, f"Diferencia en cadena '{test_str}'")
 
 
 class TestPerformance(unittest.TestCase):
@@ -450,37 +637,39 @@ class TestPerformance(unittest.TestCase):
         #regex que podría ser problemática
         large_regex = "a" * 50 + "*"
         
-        start_time = time.time()
+        #reloj monotono: no le afectan los ajustes de hora del sistema
+        start_ns = time.perf_counter_ns()
         
         postfix = to_postfix(large_regex)
         nfa = postfix_to_nfa(postfix)
         dfa = nfa.determinize()
         minimized = minimize_hopcroft(dfa)
         
-        end_time = time.time()
+        elapsed_ns = time.perf_counter_ns() - start_ns
         
         #debería completarse en menos de 5 segundos
-        self.assertLess(end_time - start_time, 5.0)
+        self.assertLess(elapsed_ns, 5_000_000_000)
     
     def test_deep_nesting_performance(self):
         """Verificar rendimiento con anidamiento profundo"""
         #crear regex con anidamiento profundo pero limitado
         nested_regex = "(" * 10 + "a" + ")" * 10
         
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         
         try:
             postfix = to_postfix(nested_regex)
             nfa = postfix_to_nfa(postfix)
             #solo verificar que no se cuelgue
-        except Exception:
-            #puede fallar debido a limitaciones, pero no debería colgarse
+        except (RegexValidationError, ValueError):
+            #puede rechazarse por limitaciones, pero no debería colgarse; otros
+            #errores son fallas reales
             pass
         
-        end_time = time.time()
+        elapsed_ns = time.perf_counter_ns() - start_ns
         
         #no debería tomar más de 2 segundos
-        self.assertLess(end_time - start_time, 2.0)
+        self.assertLess(elapsed_ns, 2_000_000_000)
 
 
 class TestEdgeCases(unittest.TestCase):
@@ -496,25 +685,19 @@ class TestEdgeCases(unittest.TestCase):
         #regex que acepta cualquier cadena sobre el alfabeto
         regex = "(a|b)*"
         
-        postfix = to_postfix(regex)
-        nfa = postfix_to_nfa(postfix)
-        dfa = nfa.determinize()
-        
-        #debería aceptar cadenas vacías y cualquier combinación de a y b
-        test_cases = ["", "a", "b", "ab", "ba", "aaa", "bbb", "abab"]
+        _, _, dfa, _ = _build(regex)
         
-        for test_str in test_cases:
-            with self.subTest(string=test_str):
-                path, accepted = dfa.simulate_dfa_path(test_str)
-                self.assertTrue(accepted)
+        #debería aceptar la cadena vacía y toda combinación de a y b (hasta largo 4)
+        test_cases = [""] + ["".join(p) for n in range(1, 5) for p in product("ab", repeat=n)]
+        results = [dfa.simulate_dfa(string) for string in test_cases]
+        self.assertTrue(all(results),
+                        f"Rechazadas: {[s for s, accepted in zip(test_cases, results) if not accepted]}")
     
     def test_single_character_alphabet(self):
         """Pruebas con alfabeto de un solo carácter"""
         regex = "a*"
         
-        postfix = to_postfix(regex)
-        nfa = postfix_to_nfa(postfix)
-        dfa = nfa.determinize()
+        _, _, dfa, _ = _build(regex)
         
         #debería aceptar "", "a", "aa", etc.
         valid_strings = ["", "a", "aa", "aaa"]